@@ -9,59 +9,25 @@ Author: Chase Wortman
 
 import sys
 import numpy as np
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtWidgets import QApplication, QMainWindow, QOpenGLWidget
-from OpenGL.GL import *
+from sb7.gl import glClearBufferfv, GL_COLOR
+from sb7 import Application, run
 
 
-class MainWidget(QOpenGLWidget):
+class SimpleApplication(Application):
+    # Nothing moves, so frames are only drawn when the window needs painting
+    animated = False
+
     def __init__(self):
-        # noinspection PyArgumentList
         super().__init__()
-        # Set focus to window
-        self.setFocusPolicy(Qt.StrongFocus)
-        # Start timer for widget updates
-        self.startTimer(0)
-
-    def timerEvent(self, event):
-        # Update widget at each timer event
-        self.update()
-
-    def minimumSizeHint(self):
-        # Minimum size the window will allow
-        return QSize(100, 100)
-
-    def sizeHint(self):
-        # Default size of the window
-        return QSize(800, 800)
+        # Define float array for background color once
+        self.red = np.array([1.0, 0.0, 0.0, 1.0], 'f')
 
-    def paintGL(self):
-        # Define float array for background color
-        red = np.array([1.0, 0.0, 0.0, 1.0], 'f')
+    def render(self, current_time):
         # Set background color
-        glClearBufferfv(GL_COLOR, 0, red)
+        glClearBufferfv(GL_COLOR, 0, self.red)
+        self.end_pass('clear')
 
 
-class MainWindow(QMainWindow):
-    def __init__(self):
-        # noinspection PyArgumentList
-        super().__init__()
-        # Set window title name
-        self.setWindowTitle('OpenGL Window')
-        # Create MainWidget object which is derived from QWidget
-        self.main_widget = MainWidget()
-        # Define MainWidget as the CentralWidget for the MainWindow
-        self.setCentralWidget(self.main_widget)
-        # Show the MainWindow
-        self.show()
-
 if __name__ == '__main__':
-    # Start Qt Application
-    app = QApplication(sys.argv)
-    # Create MainWindow object which is derived from QMainWindow
-    window = MainWindow()
-    # Center the MainWindow on the screen
-    window.move((app.desktop().screenGeometry().width() - window.width()) / 2,
-                (app.desktop().screenGeometry().height() - window.height()) / 2)
     # Exit application when app execution is finished
-    sys.exit(app.exec_())
+    sys.exit(run(SimpleApplication))
@@ -8,101 +8,37 @@ Author: Chase Wortman
 """
 
 import sys
-import time
-import numpy as np
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtWidgets import QApplication, QMainWindow, QOpenGLWidget
-from OpenGL.GL import shaders
-from OpenGL.GL import *
+from sb7.gl import glClearBufferfv, glDrawArrays, GL_COLOR, GL_POINTS
+from sb7 import Application, FrameState, run
 
 
-class MainWidget(QOpenGLWidget):
+class UsingShaders(Application):
     def __init__(self):
-        # noinspection PyArgumentList
         super().__init__()
-        # Set focus to window
-        self.setFocusPolicy(Qt.StrongFocus)
-        # Start time for use with calculations later
-        self.start_time = time.time()
-        # Start timer for widget updates
-        self.startTimer(0)
         # Initialise shader program
         self.program = None
+        # Per-frame arrays allocated once and updated in place
+        self.state = FrameState()
 
-    def timerEvent(self, event):
-        # Update widget at each timer event
-        self.update()
+    def startup(self):
+        # Compile shaders from the shader library into a program
+        self.program = self.load_program('point.vert', 'solid.frag')
 
-    def minimumSizeHint(self):
-        # Minimum size the window will allow
-        return QSize(100, 100)
-
-    def sizeHint(self):
-        # Default size of the window
-        return QSize(800, 800)
-
-    def initializeGL(self):
-        # Define vertex shader
-        vertex_shader = shaders.compileShader("""
-        #version 440 core
-
-        void main(void)
-        {
-            gl_Position = vec4(0.0, 0.0, 0.5, 1.0);
-        }
-        """, GL_VERTEX_SHADER)
-        # Define fragment shader
-        fragment_shader = shaders.compileShader("""
-        #version 440 core
-
-        out vec4 color;
-
-        void main(void)
-        {
-            color = vec4(0.0, 0.8, 1.0, 1.0);
-        }
-        """, GL_FRAGMENT_SHADER)
-        # Compile shaders into program
-        self.program = shaders.compileProgram(vertex_shader, fragment_shader)
-        # Cleanup shaders since they aren't needed anymore
-        shaders.glDeleteShader(vertex_shader)
-        shaders.glDeleteShader(fragment_shader)
-
-    def paintGL(self):
-        # Get time in seconds since start
-        time_now = time.time() - self.start_time
-        # Define float array for background color
-        bg_color = np.array([np.sin(time_now) * 0.5 + 0.5, np.cos(time_now) * 0.5 + 0.5, 0.0, 1.0], 'f')
+    def render(self, current_time):
+        # Update background color in place
+        state = self.state.update(current_time)
         # Set background color
-        glClearBufferfv(GL_COLOR, 0, bg_color)
+        glClearBufferfv(GL_COLOR, 0, state.bg_color)
+        self.end_pass('clear')
         # Use program for rendering
-        glUseProgram(self.program)
+        self.gl_state.use_program(self.program)
+        # Increase point size before drawing, only the first frame sets it
+        self.gl_state.point_size(40.0)
         # Draw triangle from vertices in the vertex shader
         glDrawArrays(GL_POINTS, 0, 1)
-        # Increase point size
-        glPointSize(40.0)
-
+        self.end_pass('draw')
 
-class MainWindow(QMainWindow):
-    def __init__(self):
-        # noinspection PyArgumentList
-        super().__init__()
-        # Set window title name
-        self.setWindowTitle('OpenGL Window')
-        # Create MainWidget object which is derived from QWidget
-        self.main_widget = MainWidget()
-        # Define MainWidget as the CentralWidget for the MainWindow
-        self.setCentralWidget(self.main_widget)
-        # Show the MainWindow
-        self.show()
 
 if __name__ == '__main__':
-    # Start Qt Application
-    app = QApplication(sys.argv)
-    # Create MainWindow object which is derived from QMainWindow
-    window = MainWindow()
-    # Center the MainWindow on the screen
-    window.move((app.desktop().screenGeometry().width() - window.width()) / 2,
-                (app.desktop().screenGeometry().height() - window.height()) / 2)
     # Exit application when app execution is finished
-    sys.exit(app.exec_())
+    sys.exit(run(UsingShaders))
@@ -5,211 +5,91 @@ Geometry shader changes tessellated triangle into points while continuing
 to pass color through from vertex shader to fragment shaderto draw only the
 points of a moving tessellated triangle on a color changing background.
 
+The points the geometry shader emits can also be captured once with
+transform feedback and drawn again on later frames until the tessellation
+levels change. Both ways give the same pixels and are timed over the first
+frames to keep the faster one.
+
+With more than one view the geometry shader runs once per view and sends
+each copy of the points to its own tile of the window, or to its own layer
+of an array texture, so every view comes from the same single draw.
+
 Author: Chase Wortman
 """
 
 import sys
-import time
-import numpy as np
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtWidgets import QApplication, QMainWindow, QOpenGLWidget
-from OpenGL.GL import shaders
-from OpenGL.GL import *
-
-
-class MainWidget(QOpenGLWidget):
-    def __init__(self):
-        # noinspection PyArgumentList
-        super().__init__()
-        # Set focus to window
-        self.setFocusPolicy(Qt.StrongFocus)
-        # Start time for use with calculations later
-        self.start_time = time.time()
-        # Start timer for widget updates
-        self.startTimer(0)
-        # Initialise shader program
-        self.program = None
-
-    def timerEvent(self, event):
-        # Update widget at each timer event
-        self.update()
-
-    def minimumSizeHint(self):
-        # Minimum size the window will allow
-        return QSize(100, 100)
-
-    def sizeHint(self):
-        # Default size of the window
-        return QSize(800, 800)
-
-    def initializeGL(self):
-        # Define vertex shader
-        vertex_shader = shaders.compileShader("""
-        #version 440
-
-        // 'offset' and 'color' are input vertex attributes
-        layout(location = 0) in vec4 offset;
-        layout(location = 1) in vec4 color;
-
-        // 'vs_color' is an output that will be sent to the tessellation control shader
-        out vec4 vs_color;
-
-        void main(void)
-        {
-            const vec4 vertices[3] = vec4[3](vec4(0.25, -0.25, 0.5, 1.0),
-                                         vec4(-0.25, -0.25, 0.5, 1.0),
-                                         vec4(0.25, 0.25, 0.5, 1.0));
-
-            // Add 'offset' to our hard-coded vertex position
-            gl_Position = vertices[gl_VertexID] + offset;
-
-            // Output a fixed value for vs_color
-            vs_color = color;
-        }
-        """, GL_VERTEX_SHADER)
-        # Define tessellation control shader
-        tess_control_shader = shaders.compileShader("""
-        #version 440
-
-        layout(vertices = 3) out;
-
-        // Input from vertex shader in array form
-        in vec4 vs_color[];
-
-        // Output to the tessellation evaluation shader in patch form
-        patch out vec4 vc_color;
+from sb7.gl import glClearBufferfv, GL_COLOR, GL_PATCHES, GL_POINTS
+from sb7 import FastestPath, MultiDrawIndirect, MultiView, ProgramCache, TessellatedTriangle, TessellationCapture, run
 
-        void main(void)
-        {
-            // Only if I am invocation 0...
-            if (gl_InvocationID == 0)
-            {
-                gl_TessLevelInner[0] = 5.0;
-                gl_TessLevelOuter[0] = 5.0;
-                gl_TessLevelOuter[1] = 5.0;
-                gl_TessLevelOuter[2] = 5.0;
-            }
 
-            // Everybody copies their input to their output
-            gl_out[gl_InvocationID].gl_Position = gl_in[gl_InvocationID].gl_Position;
+class GeometryShaders(TessellatedTriangle):
+    # Reuse linked program binaries across launches
+    program_cache = ProgramCache()
+    # 'shader' draws patches, 'capture' the points captured with transform feedback, None times both
+    tessellation_path = None
+    # Views drawn by every draw call, as tiles of the window or as layers copied to them
+    view_count = 1
+    view_layers = False
 
-            // Pass color from vertex shader to tessellation evaluation shader
-            vc_color = vs_color[gl_InvocationID];
-        }
-        """, GL_TESS_CONTROL_SHADER)
-        # Define tessellation evaluation shader
-        tess_eval_shader = shaders.compileShader("""
-        #version 440
-
-        layout(triangles, equal_spacing, cw) in;
-
-        // Input from tessellation control shader in patch form
-        patch in vec4 vc_color;
-
-        // Output to geometry shader
-        out vec4 ve_color;
-
-        void main(void)
-        {
-            gl_Position = (gl_TessCoord.x * gl_in[0].gl_Position +
-                           gl_TessCoord.y * gl_in[1].gl_Position +
-                           gl_TessCoord.z * gl_in[2].gl_Position);
-
-            // Pass color from tessellation control shader to fragment shader
-            ve_color = vc_color;
-        }
-        """, GL_TESS_EVALUATION_SHADER)
-        # Define geometry shader
-        geometry_shader = shaders.compileShader("""
-        #version 440
-
-        layout(triangles) in;
-        layout(points, max_vertices = 3) out;
-
-        // Input from tessellation evaluation shader in array form
-        in vec4 ve_color[];
-
-        // Output to fragment shader
-        out vec4 gs_color;
-
-        void main(void)
-        {
-            int i;
-
-            for (i = 0; i < gl_in.length(); i++)
-            {
-            gs_color = ve_color[i];
-            gl_Position = gl_in[i].gl_Position;
-            EmitVertex();
-            }
-        }
-        """, GL_GEOMETRY_SHADER)
-
-        # Define fragment shader
-        fragment_shader = shaders.compileShader("""
-        #version 440
-
-        // Input from geometry shader
-        in vec4 gs_color;
-
-        // Output to the framebuffer
-        out vec4 color;
-
-        void main(void)
-        {
-            // Simply assign the color we were given by the geometry shader to our output
-            color = gs_color;
-        }
-        """, GL_FRAGMENT_SHADER)
-        # Compile shaders into program
-        self.program = shaders.compileProgram(vertex_shader, tess_control_shader, tess_eval_shader, geometry_shader,
-                                              fragment_shader)
-        # Cleanup shaders since they aren't needed anymore
-        shaders.glDeleteShader(vertex_shader)
-        shaders.glDeleteShader(tess_control_shader)
-        shaders.glDeleteShader(tess_eval_shader)
-        shaders.glDeleteShader(geometry_shader)
-        shaders.glDeleteShader(fragment_shader)
-
-    def paintGL(self):
-        # Get time in seconds since start
-        time_now = time.time() - self.start_time
-        # Define float arrays for background color, offset, and triangle color
-        bg_color = np.array([np.sin(time_now) * 0.5 + 0.5, np.cos(time_now) * 0.5 + 0.5, 0.0, 1.0], 'f')
-        offset = np.array([np.sin(time_now) * 0.5, np.cos(time_now) * 0.6, 0.0, 0.0], 'f')
-        color = np.array([0.0, 0.0, 0.0, 0.0], 'f')
-        # Set background color
-        glClearBufferfv(GL_COLOR, 0, bg_color)
-        # Use program for rendering
-        glUseProgram(self.program)
-        # Pass arrays to shader attributes
-        glVertexAttrib4fv(0, offset)
-        glVertexAttrib4fv(1, color)
-        # Draw patches from vertices in the vertex shader
-        glDrawArrays(GL_PATCHES, 0, 3)
-        glPointSize(5)
-
-
-class MainWindow(QMainWindow):
     def __init__(self):
-        # noinspection PyArgumentList
         super().__init__()
-        # Set window title name
-        self.setWindowTitle('OpenGL Window')
-        # Create MainWidget object which is derived from QWidget
-        self.main_widget = MainWidget()
-        # Define MainWidget as the CentralWidget for the MainWindow
-        self.setCentralWidget(self.main_widget)
-        # Show the MainWindow
-        self.show()
+        # Tiles or layers the geometry shader sends the points to when there is more than one view
+        self.views = None
+
+    def startup(self):
+        defines = {'VERTEX_OFFSET': 1, 'VERTEX_COLOR': 1, 'CAPTURE_TESS_COORD': 1}
+        paths = [self.tessellation_path] if self.tessellation_path else ['shader', 'capture']
+        if self.view_count > 1:
+            self.views = MultiView(self.view_count, self.view_layers)
+            self.views.create(self)
+            defines.update(self.views.defines)
+            # Only the geometry stage sends points to the views, the captured points are drawn without one
+            paths = ['shader']
+        self.path = FastestPath(paths)
+        # Describe every patch in an indirect command buffer when drawing more than one
+        if self.patch_count > 1:
+            self.patches = MultiDrawIndirect(self.patch_count, 3, GL_PATCHES)
+            self.patches.create(self)
+        # Captured points share the vertex array of the per-patch attributes to draw every patch as an instance
+        if 'capture' in paths:
+            self.captured = TessellationCapture(GL_POINTS)
+            self.captured.create(self, self.patches.attributes.vao if self.patches is not None else None)
+            self.capture_pipeline = self.load_pipeline('triangle.vert', 'color.frag', VERTEX_OFFSET=1,
+                                                       VERTEX_COLOR=1, TESS_COORD=3)
+        # Build a program pipeline from separable stages in the shader library, its points can be captured
+        self.pipeline = self.load_pipeline('triangle.vert', 'tessellation.tesc', 'tessellation.tese', 'points.geom',
+                                           'points.frag', **defines)
+
+    def render(self, current_time):
+        # Update background color, offset, and triangle color in place
+        state = self.state.update(current_time)
+        # Set background color, of every view too when there are several
+        if self.views is not None:
+            self.views.begin(self.width, self.height, state.bg_color)
+            width, height = self.views.view_size
+        else:
+            glClearBufferfv(GL_COLOR, 0, state.bg_color)
+            width, height = self.width, self.height
+        self.end_pass('clear')
+        # Size of the points emitted by the geometry shader, only the first frame sets it
+        self.gl_state.point_size(5.0)
+        # Update the tessellation level cap and the uniform of the size each view is drawn at
+        self.tessellation.update(current_time, width, height)
+        if self.path.begin() == 'capture':
+            self.render_captured(current_time, state)
+        else:
+            self.render_patches(current_time, state)
+        self.path.end()
+        if self.views is not None:
+            self.views.end()
+        self.end_pass('draw')
+
 
 if __name__ == '__main__':
-    # Start Qt Application
-    app = QApplication(sys.argv)
-    # Create MainWindow object which is derived from QMainWindow
-    window = MainWindow()
-    # Center the MainWindow on the screen
-    window.move((app.desktop().screenGeometry().width() - window.width()) / 2,
-                (app.desktop().screenGeometry().height() - window.height()) / 2)
+    # Optional patch count and view count, e.g. 5000 4 draws five thousand patches into four tiles
+    if len(sys.argv) > 1:
+        GeometryShaders.patch_count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        GeometryShaders.view_count = int(sys.argv[2])
     # Exit application when app execution is finished
-    sys.exit(app.exec_())
+    sys.exit(run(GeometryShaders))
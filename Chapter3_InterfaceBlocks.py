@@ -3,136 +3,72 @@ PyOpenGL OpenGL SuperBible Chapter 3 Interface Blocks
 
 Passing interface blocks between shaders to draw a moving triangle on
 a color changing background with movement and color defined outside of
-the shaders.
+the shaders. A single triangle gets its movement and color from a uniform
+block uploaded once per frame.
 
 Author: Chase Wortman
 """
 
 import sys
-import time
-import numpy as np
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtWidgets import QApplication, QMainWindow, QOpenGLWidget
-from OpenGL.GL import shaders
-from OpenGL.GL import *
+from sb7.gl import glClearBufferfv, glDrawArrays, GL_COLOR, GL_TRIANGLES
+from sb7 import Application, FrameState, InstancedAttributes, UniformBlock, run
 
 
-class MainWidget(QOpenGLWidget):
+class InterfaceBlocks(Application):
+    # Triangles drawn per frame, more than one switches to instanced rendering
+    instance_count = 1
+
     def __init__(self):
-        # noinspection PyArgumentList
         super().__init__()
-        # Set focus to window
-        self.setFocusPolicy(Qt.StrongFocus)
-        # Start time for use with calculations later
-        self.start_time = time.time()
-        # Start timer for widget updates
-        self.startTimer(0)
         # Initialise shader program
         self.program = None
-
-    def timerEvent(self, event):
-        # Update widget at each timer event
-        self.update()
-
-    def minimumSizeHint(self):
-        # Minimum size the window will allow
-        return QSize(100, 100)
-
-    def sizeHint(self):
-        # Default size of the window
-        return QSize(800, 800)
-
-    def initializeGL(self):
-        # Define vertex shader
-        vertex_shader = shaders.compileShader("""
-        #version 440 core
-
-        // 'offset' and 'color' are input vertex attributes
-        layout(location = 0) in vec4 offset;
-        layout(location = 1) in vec4 color;
-
-        // Declare VS_OUT as an output interface block
-        out VS_OUT
-        {
-            vec4 color; // Send color to the next stage
-        } vs_out;
-
-        void main(void)
-        {
-            const vec4 vertices[3] = vec4[3](vec4(0.25, -0.25, 0.5, 1.0),
-                                         vec4(-0.25, -0.25, 0.5, 1.0),
-                                         vec4(0.25, 0.25, 0.5, 1.0));
-
-            // Add 'offset' to our hard-coded vertex position
-            gl_Position = vertices[gl_VertexID] + offset;
-
-            // Output a fixed value for vs_color
-            vs_out.color = color;
-        }
-        """, GL_VERTEX_SHADER)
-        # Define fragment shader
-        fragment_shader = shaders.compileShader("""
-        #version 440 core
-
-        // Declare VS_OUT as an input interface block
-        in VS_OUT
-        {
-            vec4 color; // color from the previous stage
-        } fs_in;
-
-        // Output to the framebuffer
-        out vec4 color;
-
-        void main(void)
-        {
-            // Simply assign the color we were given by the vertex shader to our output
-            color = fs_in.color;
-        }
-        """, GL_FRAGMENT_SHADER)
-        # Compile shaders into program
-        self.program = shaders.compileProgram(vertex_shader, fragment_shader)
-        # Cleanup shaders since they aren't needed anymore
-        shaders.glDeleteShader(vertex_shader)
-        shaders.glDeleteShader(fragment_shader)
-
-    def paintGL(self):
-        # Get time in seconds since start
-        time_now = time.time() - self.start_time
-        # Define float arrays for background color, offset, and triangle color
-        bg_color = np.array([np.sin(time_now) * 0.5 + 0.5, np.cos(time_now) * 0.5 + 0.5, 0.0, 1.0], 'f')
-        offset = np.array([np.sin(time_now) * 0.5, np.cos(time_now) * 0.6, 0.0, 0.0], 'f')
-        color = np.array([0.0, 0.0, 0.0, 0.0], 'f')
+        # Per-frame arrays allocated once and updated in place
+        self.state = FrameState()
+        # Per-instance offsets and colors when drawing instanced
+        self.instances = None
+        # Offset and color of a single triangle, laid out like the shader's FrameBlock
+        self.frame_block = UniformBlock('FrameBlock')
+
+    def startup(self):
+        # Feed offset and color from instance buffers when drawing more than one triangle
+        if self.instance_count > 1:
+            self.instances = InstancedAttributes(self.instance_count)
+            self.instances.create(self)
+            self.program = self.load_program('interface_block.vert', 'interface_block.frag')
+        else:
+            self.frame_block.create(self)
+            self.program = self.load_program('interface_block.vert', 'interface_block.frag', FRAME_BLOCK=1)
+
+    def on_program_linked(self, program):
+        # Read the block layout once the program has linked
+        if self.instances is None:
+            self.frame_block.locate(program)
+
+    def render(self, current_time):
+        # Update background color, offset, and triangle color in place
+        state = self.state.update(current_time)
         # Set background color
-        glClearBufferfv(GL_COLOR, 0, bg_color)
+        glClearBufferfv(GL_COLOR, 0, state.bg_color)
+        self.end_pass('clear')
         # Use program for rendering
-        glUseProgram(self.program)
-        # Pass arrays to shader attributes
-        glVertexAttrib4fv(0, offset)
-        glVertexAttrib4fv(1, color)
-        # Draw triangle from vertices in the vertex shader
-        glDrawArrays(GL_TRIANGLES, 0, 3)
-
+        self.gl_state.use_program(self.program)
+        if self.instances is not None:
+            # Animate every instance and draw them all with one call
+            self.instances.update(current_time)
+            self.instances.draw(GL_TRIANGLES, 0, 3)
+        else:
+            # Upload offset and color with one call
+            self.frame_block.values['offset'] = state.offset
+            self.frame_block.values['color'] = state.color
+            self.frame_block.upload()
+            # Draw triangle from vertices in the vertex shader
+            glDrawArrays(GL_TRIANGLES, 0, 3)
+        self.end_pass('draw')
 
-class MainWindow(QMainWindow):
-    def __init__(self):
-        # noinspection PyArgumentList
-        super().__init__()
-        # Set window title name
-        self.setWindowTitle('OpenGL Window')
-        # Create MainWidget object which is derived from QWidget
-        self.main_widget = MainWidget()
-        # Define MainWidget as the CentralWidget for the MainWindow
-        self.setCentralWidget(self.main_widget)
-        # Show the MainWindow
-        self.show()
 
 if __name__ == '__main__':
-    # Start Qt Application
-    app = QApplication(sys.argv)
-    # Create MainWindow object which is derived from QMainWindow
-    window = MainWindow()
-    # Center the MainWindow on the screen
-    window.move((app.desktop().screenGeometry().width() - window.width()) / 2,
-                (app.desktop().screenGeometry().height() - window.height()) / 2)
+    # Optional instance count, e.g. 10000 draws ten thousand triangles
+    if len(sys.argv) > 1:
+        InterfaceBlocks.instance_count = int(sys.argv[1])
     # Exit application when app execution is finished
-    sys.exit(app.exec_())
+    sys.exit(run(InterfaceBlocks))
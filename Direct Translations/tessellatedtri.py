@@ -8,37 +8,29 @@ to draw a moving tessellated triangle on a color changing background.
 Author: Chase Wortman
 """
 
+import os
 import sys
 import numpy as np
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtWidgets import QApplication, QMainWindow, QOpenGLWidget
-from OpenGL.GL import *
 
+# Make the sb7 framework in the parent directory importable
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from sb7.gl import (glAttachShader, glBindVertexArray, glClearBufferfv, glCompileShader, glCreateProgram,
+                    glCreateShader, glDeleteProgram, glDeleteVertexArrays, glDrawArrays, glGenVertexArrays,
+                    glLinkProgram, glPolygonMode, glShaderSource, glUseProgram, GL_COLOR, GL_FRAGMENT_SHADER,
+                    GL_FRONT_AND_BACK, GL_LINE, GL_PATCHES, GL_TESS_CONTROL_SHADER, GL_TESS_EVALUATION_SHADER,
+                    GL_VERTEX_SHADER)
+from sb7 import Application, run
 
-class MainWidget(QOpenGLWidget):
+
+class TessellatedTri(Application):
     def __init__(self):
-        # noinspection PyArgumentList
         super().__init__()
-        # Set focus to window
-        self.setFocusPolicy(Qt.StrongFocus)
-        # Start timer for widget updates
-        self.startTimer(0)
-        # Initialise shader program
+        # Initialise shader program and vertex array object
         self.program = None
+        self.vao = None
+        self.green = np.array([0.0, 0.25, 0.0, 1.0], 'f')
 
-    def timerEvent(self, event):
-        # Update widget at each timer event
-        self.update()
-
-    def minimumSizeHint(self):
-        # Minimum size the window will allow
-        return QSize(100, 100)
-
-    def sizeHint(self):
-        # Default size of the window
-        return QSize(800, 800)
-
-    def initializeGL(self):
+    def startup(self):
         # Define vertex shader
         vs_source = """
         #version 440
@@ -122,39 +114,22 @@ class MainWidget(QOpenGLWidget):
 
         glLinkProgram(self.program)
 
-        vao = glGenVertexArrays(1)
-        glBindVertexArray(vao)
+        self.vao = glGenVertexArrays(1)
+        glBindVertexArray(self.vao)
 
         glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
 
-    def paintGL(self):
-        green = np.array([0.0, 0.25, 0.0, 1.0], 'f')
-        glClearBufferfv(GL_COLOR, 0, green)
+    def render(self, current_time):
+        glClearBufferfv(GL_COLOR, 0, self.green)
 
         glUseProgram(self.program)
         glDrawArrays(GL_PATCHES, 0, 3)
 
+    def shutdown(self):
+        glDeleteVertexArrays(1, [self.vao])
+        glDeleteProgram(self.program)
 
-class MainWindow(QMainWindow):
-    def __init__(self):
-        # noinspection PyArgumentList
-        super().__init__()
-        # Set window title name
-        self.setWindowTitle('OpenGL Window')
-        # Create MainWidget object which is derived from QWidget
-        self.main_widget = MainWidget()
-        # Define MainWidget as the CentralWidget for the MainWindow
-        self.setCentralWidget(self.main_widget)
-        # Show the MainWindow
-        self.show()
 
 if __name__ == '__main__':
-    # Start Qt Application
-    app = QApplication(sys.argv)
-    # Create MainWindow object which is derived from QMainWindow
-    window = MainWindow()
-    # Center the MainWindow on the screen
-    window.move((app.desktop().screenGeometry().width() - window.width()) / 2,
-                (app.desktop().screenGeometry().height() - window.height()) / 2)
     # Exit application when app execution is finished
-    sys.exit(app.exec_())
+    sys.exit(run(TessellatedTri))
@@ -0,0 +1,61 @@
+"""
+PyOpenGL OpenGL SuperBible Framework
+
+Shared application framework used by every chapter example, modelled on
+the sb7 framework that ships with the book.
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+import importlib
+
+# Fall back to EGL on display-less Linux machines so examples can run headless
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY') and not os.environ.get('WAYLAND_DISPLAY'):
+    os.environ.setdefault('PYOPENGL_PLATFORM', 'egl')
+
+from sb7.application import Application
+
+# Module of every class and function imported on first use, so an example only pays for the features it uses.
+# The Qt host is only needed for a window, and the CPU tessellator also runs as python -m sb7.tessellator
+LAZY_ATTRIBUTES = {
+    'AdaptiveTessellation': 'sb7.lod',
+    'FastestPath': 'sb7.tessellator',
+    'FrameState': 'sb7.framestate',
+    'InstancedAttributes': 'sb7.instancing',
+    'MainWidget': 'sb7.window',
+    'MainWindow': 'sb7.window',
+    'MultiDrawIndirect': 'sb7.indirect',
+    'MultiView': 'sb7.multiview',
+    'PersistentBuffer': 'sb7.persistent',
+    'ProgramCache': 'sb7.programcache',
+    'SceneState': 'sb7.scene',
+    'ShaderLibrary': 'sb7.shaderlib',
+    'TessellatedMesh': 'sb7.tessellator',
+    'TessellatedTriangle': 'sb7.triangle',
+    'TessellationCapture': 'sb7.feedback',
+    'UniformBlock': 'sb7.uniforms',
+    'tessellate_triangle': 'sb7.tessellator',
+    'tessellation_supported': 'sb7.tessellator',
+}
+# Public names, the lazy ones included so from sb7 import * imports them too
+__all__ = ['Application', 'run', *LAZY_ATTRIBUTES]
+
+
+def run(application_class):
+    # Qt is only imported when an example is shown in a window
+    from sb7.window import run as run_window
+    return run_window(application_class)
+
+
+def __getattr__(name):
+    # Import the module of a feature on first use
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError("module 'sb7' has no attribute '{}'".format(name))
+    return getattr(importlib.import_module(LAZY_ATTRIBUTES[name]), name)
+
+
+def __dir__():
+    # List the features that are not imported yet too
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,306 @@
+"""
+PyOpenGL OpenGL SuperBible Application
+
+Base class for every example, the Python counterpart of sb7::application.
+Examples override startup, render and shutdown while the framework owns the
+OpenGL context, drives the render loop and releases shared resources.
+
+Author: Chase Wortman
+"""
+
+import os
+import numpy as np
+from sb7.gl import (glClearBufferfv, glDeleteBuffers, glDeleteFramebuffers, glDeleteProgram,
+                    glDeleteProgramPipelines, glDeleteQueries, glDeleteTextures, glDeleteTransformFeedbacks,
+                    glDeleteVertexArrays, glGenBuffers, glGenFramebuffers, glGenQueries, glGenTextures,
+                    glGenTransformFeedbacks, glGenVertexArrays, GL_COLOR)
+from sb7.shaders import create_program
+from sb7.shaderlib import ShaderLibrary
+from sb7.state import GLState
+
+# Ways the host schedules frames, see Application.render_mode
+RENDER_MODES = ('on_demand', 'continuous')
+
+
+class Application(object):
+    # Window title and default window size
+    title = 'OpenGL Window'
+    width = 800
+    height = 800
+    # Optional ProgramCache used by create_program
+    program_cache = None
+    # Optional GpuTimer, SB7_GPU_TIMES=file.csv or file.json enables one at startup
+    gpu_timer = None
+    # Optional FrameCapture, SB7_CAPTURE=directory or file.y4m enables one at startup
+    frame_capture = None
+    # Clock giving every frame its time, SB7_CLOCK=real, fixed[:step] or replay:recording picks one
+    clock = None
+    # Optional InputRecorder, SB7_RECORD=file records the inputs of every frame
+    input_recorder = None
+    # Optional GLTracer, SB7_TRACE=file.json traces every GL call into a Chrome trace
+    tracer = None
+    # Directory of the GLSL files used by load_program, None for the shared shaders directory
+    shader_directory = None
+    # Link programs and pipelines in the background, SB7_ASYNC_SHADERS=1 turns this on
+    async_shaders = False
+    # Background shown by render_loading while programs are still linking
+    loading_color = np.array([0.0, 0.0, 0.0, 1.0], 'f')
+    # Whether the scene changes from frame to frame, a static scene is drawn again only when asked to
+    animated = True
+    # 'on_demand' paints while the scene changes or after resizes and exposes, 'continuous' paints back to back,
+    # SB7_RENDER=on_demand or continuous picks one
+    render_mode = 'on_demand'
+
+    def __init__(self):
+        # GLSL files by name, SB7_HOT_RELOAD=1 relinks programs when their files change
+        self.shader_library = ShaderLibrary(self.shader_directory, watch=bool(os.environ.get('SB7_HOT_RELOAD')))
+        if os.environ.get('SB7_ASYNC_SHADERS'):
+            self.async_shaders = True
+        if os.environ.get('SB7_RENDER'):
+            self.render_mode = os.environ['SB7_RENDER']
+        if self.render_mode not in RENDER_MODES:
+            raise ValueError('Unknown render mode {}'.format(self.render_mode))
+        # Set by the host to schedule a frame, see request_frame
+        self.frame_requested = None
+        # Bindings and render state, skipping calls that change nothing
+        self.gl_state = GLState()
+        # Programs and pipelines that have not finished linking, with their checks and hooks
+        self._linking = []
+        self._loading_shown = False
+        # Resources created through the framework, released on shutdown
+        self._programs = []
+        self._pipelines = []
+        self._vertex_arrays = []
+        self._buffers = []
+        self._transform_feedbacks = []
+        self._queries = []
+        self._textures = []
+        self._framebuffers = []
+        self._persistent_buffers = []
+
+    def startup(self):
+        # Create shaders, programs and buffers once the context is current
+        pass
+
+    def render(self, current_time):
+        # Draw a single frame, current_time is in seconds since startup
+        pass
+
+    def shutdown(self):
+        # Release anything not created through the framework helpers
+        pass
+
+    def on_resize(self, width, height):
+        # Keep track of the current framebuffer size
+        self.width = width
+        self.height = height
+
+    @property
+    def needs_frame(self):
+        # Whether the host should paint again right away, checked after every frame
+        if self.render_mode == 'continuous' or self.animated:
+            return True
+        # Static scenes still need frames while programs link and while shader files are watched for changes
+        return bool(self._linking) or self.shader_library.watch
+
+    def request_frame(self):
+        # Ask the host for one more frame after changing a static scene
+        if self.frame_requested is not None:
+            self.frame_requested()
+
+    def render_loading(self, current_time):
+        # Draw a frame while programs are still linking
+        glClearBufferfv(GL_COLOR, 0, self.loading_color)
+
+    def on_program_linked(self, program):
+        # Called once a program from load_program is linked, and again after every hot reload
+        pass
+
+    def on_pipeline_linked(self, pipeline):
+        # Called once every stage of a pipeline from load_pipeline is linked, and after hot reloads
+        pass
+
+    def end_pass(self, name):
+        # Mark the end of a render pass for GPU timing
+        if self.gpu_timer is not None:
+            self.gpu_timer.end_pass(name)
+
+    def create_program(self, *stages):
+        # Load the program from the binary cache when the application has one
+        if self.program_cache is not None:
+            program = self.program_cache.create_program(*stages)
+            self._programs.append(program)
+            return program
+        # Compile each (source, shader type) stage into a program
+        program = create_program(*stages)
+        # Release the program with the rest of the application resources
+        self._programs.append(program)
+        return program
+
+    def load_program(self, *names, **defines):
+        # Build a program from files in the shader library, passing keywords as #defines
+        if self.async_shaders:
+            # Frames show render_loading until the program has linked
+            program = self.shader_library.start_program(names, defines)
+            self._programs.append(program)
+            self._linking.append((self.shader_library.program_linked, self.on_program_linked, program))
+            return program
+        if self.program_cache is not None and not self.shader_library.watch:
+            program = self.program_cache.create_program(*self.shader_library.stages(names, defines))
+        else:
+            program = self.shader_library.create_program(names, defines)
+        self._programs.append(program)
+        self.on_program_linked(program)
+        return program
+
+    def load_pipeline(self, *names, **defines):
+        # Build a program pipeline with one separable program per stage file
+        library = self.shader_library
+        program_cache = None if self.async_shaders or library.watch else self.program_cache
+        pipeline = library.create_pipeline(names, defines, program_cache, wait=not self.async_shaders)
+        self._pipelines.append(pipeline)
+        if self.async_shaders:
+            self._linking.append((library.pipeline_linked, self.on_pipeline_linked, pipeline))
+        else:
+            self.on_pipeline_linked(pipeline)
+        return pipeline
+
+    def create_vertex_array(self):
+        # Create vertex array object released on shutdown
+        vertex_array = glGenVertexArrays(1)
+        self._vertex_arrays.append(vertex_array)
+        return vertex_array
+
+    def create_buffer(self):
+        # Create buffer object released on shutdown
+        buffer = glGenBuffers(1)
+        self._buffers.append(buffer)
+        return buffer
+
+    def create_transform_feedback(self):
+        # Create transform feedback object released on shutdown
+        transform_feedback = glGenTransformFeedbacks(1)
+        self._transform_feedbacks.append(transform_feedback)
+        return transform_feedback
+
+    def create_query(self):
+        # Create query object released on shutdown
+        query = glGenQueries(1)
+        self._queries.append(query)
+        return query
+
+    def create_texture(self):
+        # Create texture object released on shutdown
+        texture = glGenTextures(1)
+        self._textures.append(texture)
+        return texture
+
+    def create_framebuffer(self):
+        # Create framebuffer object released on shutdown
+        framebuffer = glGenFramebuffers(1)
+        self._framebuffers.append(framebuffer)
+        return framebuffer
+
+    def track_persistent_buffer(self, persistent_buffer):
+        # Persistent buffer whose fences and mapping are released on shutdown, before its buffer is deleted
+        self._persistent_buffers.append(persistent_buffer)
+
+    def initialize(self):
+        # Called by the host once its context is current
+        from sb7.clock import InputRecorder, open_clock
+        if self.clock is None:
+            self.clock = open_clock(os.environ.get('SB7_CLOCK'))
+        self.clock.start()
+        if self.input_recorder is None and os.environ.get('SB7_RECORD'):
+            self.input_recorder = InputRecorder(os.environ['SB7_RECORD'])
+        if self.gpu_timer is None and os.environ.get('SB7_GPU_TIMES'):
+            from sb7.gputimer import GpuTimer, open_sink
+            self.gpu_timer = GpuTimer(sinks=[open_sink(os.environ['SB7_GPU_TIMES'])])
+        if self.frame_capture is None and os.environ.get('SB7_CAPTURE'):
+            from sb7.capture import FrameCapture, open_writer
+            self.frame_capture = FrameCapture(open_writer(os.environ['SB7_CAPTURE']))
+        if self.tracer is None and os.environ.get('SB7_TRACE'):
+            from sb7.trace import GLTracer
+            self.tracer = GLTracer(os.environ['SB7_TRACE'])
+        if self.tracer is not None:
+            self.tracer.install(self)
+        self.startup()
+
+    def frame(self):
+        # Called by the host for every frame
+        if self._linking:
+            # Check programs only after one loading frame, drivers without parallel compile block here
+            if self._loading_shown:
+                self.finish_linking()
+            if self._linking:
+                self._loading_shown = True
+                self.render_loading(self.clock.time())
+                return
+        if self.shader_library.watch:
+            programs, pipelines = self.shader_library.poll()
+            for program in programs:
+                self.on_program_linked(program)
+            for pipeline in pipelines:
+                self.on_pipeline_linked(pipeline)
+        current_time = self.clock.tick()
+        if self.gpu_timer is not None:
+            self.gpu_timer.begin_frame()
+            self.render(current_time)
+            self.gpu_timer.end_frame()
+        else:
+            self.render(current_time)
+        if self.input_recorder is not None:
+            self.input_recorder.record(current_time, self)
+        if self.frame_capture is not None:
+            self.frame_capture.capture(self.width, self.height)
+
+    def finish_linking(self):
+        # Hand every program and pipeline that finished linking to its hook
+        for entry in list(self._linking):
+            linked, on_linked, handle = entry
+            if linked(handle):
+                self._linking.remove(entry)
+                on_linked(handle)
+
+    def release(self):
+        # Called by the host while its context is still current
+        self.shutdown()
+        if self.gpu_timer is not None:
+            self.gpu_timer.release()
+        if self.frame_capture is not None:
+            self.frame_capture.close()
+        if self.input_recorder is not None:
+            self.input_recorder.close()
+        for program in self._programs:
+            glDeleteProgram(program)
+        if self._pipelines:
+            glDeleteProgramPipelines(len(self._pipelines), self._pipelines)
+        self.shader_library.release()
+        for persistent_buffer in self._persistent_buffers:
+            persistent_buffer.release()
+        if self._vertex_arrays:
+            glDeleteVertexArrays(len(self._vertex_arrays), self._vertex_arrays)
+        if self._buffers:
+            glDeleteBuffers(len(self._buffers), self._buffers)
+        if self._transform_feedbacks:
+            glDeleteTransformFeedbacks(len(self._transform_feedbacks), self._transform_feedbacks)
+        if self._queries:
+            glDeleteQueries(len(self._queries), self._queries)
+        if self._framebuffers:
+            glDeleteFramebuffers(len(self._framebuffers), self._framebuffers)
+        if self._textures:
+            glDeleteTextures(len(self._textures), self._textures)
+        self._programs = []
+        self._pipelines = []
+        self._linking = []
+        self._vertex_arrays = []
+        self._buffers = []
+        self._transform_feedbacks = []
+        self._queries = []
+        self._textures = []
+        self._framebuffers = []
+        self._persistent_buffers = []
+        # Deleted names may be reused by the next context
+        self.gl_state.invalidate()
+        if self.tracer is not None:
+            self.tracer.close()
@@ -0,0 +1,101 @@
+"""
+PyOpenGL OpenGL SuperBible Batch Rendering
+
+Renders long runs of frames of an example offline, spread over a pool of
+worker processes. Each worker creates its own headless context and renders
+ranges of frame times through a replay clock, reading every frame straight
+into a frame store on disk: a .npy file of shape (frames, height, width, 4)
+that the workers open as a shared np.memmap, so pixels never pass through a
+pipe. Load the result with np.load(path, mmap_mode='r').
+
+Every worker keeps llvmpipe to a single rasterizer thread, the pool already
+has one process per core, so throughput grows with the number of cores
+instead of workers competing for them.
+
+Usage: python -m sb7.batch Chapter3_FragmentShaders.py frames.npy [--frames N] [--start SECONDS]
+                           [--step SECONDS] [--size WIDTH HEIGHT] [--workers N]
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+# Renderer and frame store of a worker process, set up once by _start_worker
+_worker = {}
+
+
+def _start_worker(path, store_path, width, height):
+    # One rasterizer thread per process, the pool provides the parallelism
+    os.environ.setdefault('LP_NUM_THREADS', '1')
+    from sb7.clock import ReplayClock
+    from sb7.headless import HeadlessRenderer, load_application_class
+    application = load_application_class(path)()
+    application.clock = ReplayClock([])
+    _worker['renderer'] = HeadlessRenderer(application, width, height)
+    _worker['store'] = np.load(store_path, mmap_mode='r+')
+
+
+def _render_range(start, times):
+    # Render the frames from start on at the given times into the shared frame store
+    renderer = _worker['renderer']
+    store = _worker['store']
+    clock = renderer.application.clock
+    clock.times = times
+    clock.start()
+    for index in range(len(times)):
+        renderer.render_frame()
+        renderer.context.read_pixels(out=store[start + index])
+    store.flush()
+    return len(times)
+
+
+def create_frame_store(path, frames, width, height):
+    # Frame store the workers write into, readable with np.load
+    return np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(frames, height, width, 4))
+
+
+def render_batch(path, store_path, times, width=800, height=800, workers=None, chunk_size=None):
+    # Render an example at every time into a new frame store, returning the store and frames per second
+    times = np.asarray(times, np.float64)
+    workers = workers or os.cpu_count()
+    create_frame_store(store_path, len(times), width, height).flush()
+    # Several chunks per worker so workers that finish early pick up more
+    chunk_size = chunk_size or max(1, -(-len(times) // (workers * 4)))
+    start = time.perf_counter()
+    # Spawned workers start without the parent's OpenGL state
+    with ProcessPoolExecutor(workers, multiprocessing.get_context('spawn'), _start_worker,
+                             (os.path.abspath(path), store_path, width, height)) as pool:
+        chunks = [pool.submit(_render_range, first, times[first:first + chunk_size])
+                  for first in range(0, len(times), chunk_size)]
+        # Contexts go away with the worker processes, every chunk flushed its frames already
+        rendered = sum(chunk.result() for chunk in chunks)
+    elapsed = time.perf_counter() - start
+    return np.load(store_path, mmap_mode='r'), rendered / elapsed if elapsed else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Render frames of an example into a frame store')
+    parser.add_argument('example', help='example script')
+    parser.add_argument('output', help='.npy frame store to create')
+    parser.add_argument('--frames', type=int, default=1000, help='frames to render')
+    parser.add_argument('--start', type=float, default=0.0, help='time of the first frame in seconds')
+    parser.add_argument('--step', type=float, default=1.0 / 60.0, help='seconds between frames')
+    parser.add_argument('--size', type=int, nargs=2, default=(800, 800), metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--workers', type=int, help='worker processes, one per core by default')
+    arguments = parser.parse_args(argv)
+
+    times = arguments.start + np.arange(arguments.frames) * arguments.step
+    store, fps = render_batch(arguments.example, arguments.output, times, *arguments.size,
+                              workers=arguments.workers)
+    print('{}: {} frames at {:.1f} fps'.format(os.path.basename(arguments.example), len(store), fps))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+PyOpenGL OpenGL SuperBible Benchmark
+
+Runs every chapter example for a fixed number of frames, headless or in a
+window, and reports frame time percentiles, CPU time spent in the render
+hook, OpenGL call counts per frame and the calls the state cache skipped
+as JSON. A previous report can be
+given as a baseline to turn a change in frame time into a number.
+
+Examples run on a fixed timestep clock by default, so every run and every
+build renders the same frames. --clock replay:FILE renders exactly the frames
+of an input recording, --clock real follows the wall clock instead.
+
+Usage: python -m sb7.benchmark [--frames N] [--windowed] [--gpu-timing] [--clock CLOCK]
+                               [--baseline FILE] [--output FILE] [examples ...]
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import numpy as np
+from sb7.gl import glFinish
+from sb7.gputimer import GpuTimer
+from sb7.clock import open_clock
+from sb7.headless import HeadlessRenderer, load_application_class
+from sb7.trace import UNTRACED_MODULES
+
+# Directory holding the chapter examples
+EXAMPLE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Metrics compared against a baseline, lower is better for all of them
+COMPARED_METRICS = (('frame_ms', 'p50'), ('frame_ms', 'p95'), ('frame_ms', 'p99'), ('cpu_ms', 'p50'),
+                    ('gl_calls_per_frame', None))
+
+
+class GLCallCounter(object):
+    def __init__(self, application_module):
+        # Module of the example, counted along with every sb7 module loaded when installing
+        self.application_module = application_module
+        self.counts = {}
+        self._originals = []
+
+    def install(self):
+        # Replace every gl* function in the modules with a counting wrapper, the helpers the example draws
+        # through included, so calls count the same wherever they are made
+        modules = [self.application_module]
+        modules += [module for name, module in list(sys.modules.items())
+                    if name.startswith('sb7.') and name not in UNTRACED_MODULES and module is not None]
+        for module in modules:
+            for name, value in list(vars(module).items()):
+                if name.startswith('gl') and callable(value):
+                    self._originals.append((module, name, value))
+                    setattr(module, name, self._wrap(name, value))
+
+    def remove(self):
+        # Put the original functions back
+        for module, name, value in self._originals:
+            setattr(module, name, value)
+        self._originals = []
+
+    def reset(self):
+        # Start counting a new frame
+        self.counts.clear()
+
+    def _wrap(self, name, function):
+        counts = self.counts
+
+        def counted(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            return function(*args, **kwargs)
+        return counted
+
+
+class FrameProfile(object):
+    def __init__(self, counter, gpu_timer=None, gl_state=None):
+        # Per-frame wall time, render hook CPU time, GL call counts and redundant calls skipped
+        self.counter = counter
+        self.gpu_timer = gpu_timer
+        self.gl_state = gl_state
+        self.frame_times = []
+        self.cpu_times = []
+        self.gl_calls = []
+        self.skipped = []
+        self._last_start = None
+
+    def measure(self, frame, finish=True):
+        # Time one call of the render hook
+        self.counter.reset()
+        skipped = self.gl_state.skipped if self.gl_state is not None else 0
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        frame()
+        self.cpu_times.append(time.thread_time() - cpu_start)
+        self.gl_calls.append(dict(self.counter.counts))
+        if self.gl_state is not None:
+            self.skipped.append(self.gl_state.skipped - skipped)
+        if finish:
+            # Wait for the GPU so the frame time covers the whole frame
+            glFinish()
+            self.frame_times.append(time.perf_counter() - start)
+        elif self._last_start is not None:
+            # Windowed frames are measured from one paint to the next
+            self.frame_times.append(start - self._last_start)
+        self._last_start = start
+
+    def clear(self):
+        # Drop warm up frames
+        self.frame_times = []
+        self.cpu_times = []
+        self.gl_calls = []
+        self.skipped = []
+        if self.gpu_timer is not None:
+            self.gpu_timer.history.clear()
+
+    def report(self):
+        # Summarise the recorded frames
+        frame_ms = np.array(self.frame_times) * 1000.0
+        cpu_ms = np.array(self.cpu_times) * 1000.0
+        calls = {}
+        for counts in self.gl_calls:
+            for name, count in counts.items():
+                calls[name] = calls.get(name, 0) + count
+        frames = max(len(self.gl_calls), 1)
+        report = {
+            'frames': len(self.frame_times),
+            'fps': 1000.0 / frame_ms.mean() if len(frame_ms) else 0.0,
+            'frame_ms': summarise(frame_ms),
+            'cpu_ms': summarise(cpu_ms),
+            'gl_calls_per_frame': sum(calls.values()) / frames,
+            'gl_calls': {name: count / frames for name, count in sorted(calls.items())},
+            'gl_calls_skipped_per_frame': sum(self.skipped) / frames,
+        }
+        if self.gpu_timer is not None:
+            # Per pass GPU milliseconds from the timer queries
+            passes = sorted({name for _, timings in self.gpu_timer.history for name in timings})
+            report['gpu_ms'] = {name: summarise(np.array([timings[name] for _, timings in self.gpu_timer.history
+                                                          if name in timings]))
+                                for name in passes}
+        return report
+
+
+def summarise(values):
+    # Percentiles and mean of a list of milliseconds
+    if not len(values):
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'mean': 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50': float(p50), 'p95': float(p95), 'p99': float(p99), 'mean': float(values.mean())}
+
+
+def benchmark_headless(application_class, frames, warmup, width, height, gpu_timing=False, clock='fixed'):
+    # Render back to back frames into a framebuffer object
+    application = application_class()
+    application.clock = open_clock(clock)
+    if gpu_timing:
+        application.gpu_timer = GpuTimer(history=frames)
+    renderer = HeadlessRenderer(application, width, height)
+    counter = GLCallCounter(sys.modules[application_class.__module__])
+    profile = FrameProfile(counter, application.gpu_timer, application.gl_state)
+    # Installed after startup, which imports the helpers an example uses
+    counter.install()
+    try:
+        for index in range(warmup + frames):
+            if index == warmup:
+                # Measured frames start again from the first frame time
+                profile.clear()
+                application.clock.start()
+            profile.measure(renderer.render_frame)
+        report = profile.report()
+    finally:
+        counter.remove()
+        renderer.close()
+    return report
+
+
+def benchmark_windowed(application_class, frames, warmup, width, height, gpu_timing=False, clock='fixed'):
+    # Render frames through the Qt window and its render loop
+    from PyQt5.QtWidgets import QApplication
+    from sb7.window import MainWindow
+    app = QApplication.instance() or QApplication(sys.argv)
+    application = application_class()
+    application.clock = open_clock(clock)
+    application.width, application.height = width, height
+    # Frame times are measured from one paint to the next, so static scenes are painted back to back too
+    application.render_mode = 'continuous'
+    if gpu_timing:
+        application.gpu_timer = GpuTimer(history=frames)
+    counter = GLCallCounter(sys.modules[application_class.__module__])
+    profile = FrameProfile(counter, application.gpu_timer, application.gl_state)
+    report = {}
+    render_frame = application.frame
+    frame_count = [0]
+
+    def measured_frame():
+        # Profile each paint and close the window once enough frames are drawn
+        if frame_count[0] == 0:
+            # Startup has run by the first paint and imported the helpers an example uses
+            counter.install()
+        if frame_count[0] == warmup:
+            profile.clear()
+            application.clock.start()
+        profile.measure(render_frame, finish=False)
+        frame_count[0] += 1
+        if frame_count[0] > warmup + frames:
+            report.update(profile.report())
+            window.close()
+            app.quit()
+    application.frame = measured_frame
+    try:
+        window = MainWindow(application)
+        app.exec_()
+    finally:
+        counter.remove()
+    return report
+
+
+def compare(results, baseline, threshold):
+    # Relative change of every compared metric against the baseline
+    comparison = {}
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        changes = {}
+        for metric, statistic in COMPARED_METRICS:
+            current = result[metric] if statistic is None else result[metric][statistic]
+            previous = baseline[name][metric] if statistic is None else baseline[name][metric][statistic]
+            key = metric if statistic is None else '{}.{}'.format(metric, statistic)
+            change = (current - previous) / previous if previous else 0.0
+            changes[key] = {'baseline': previous, 'current': current, 'change': change}
+            if change > threshold:
+                regressions.append('{} {}'.format(name, key))
+        comparison[name] = changes
+    return comparison, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the chapter examples')
+    parser.add_argument('examples', nargs='*', help='example scripts, every Chapter*.py by default')
+    parser.add_argument('--frames', type=int, default=300, help='frames measured per example')
+    parser.add_argument('--warmup', type=int, default=30, help='frames rendered before measuring')
+    parser.add_argument('--size', type=int, nargs=2, default=(800, 800), metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--windowed', action='store_true', help='render through the Qt window')
+    parser.add_argument('--gpu-timing', action='store_true', help='add per pass GPU times from timer queries')
+    parser.add_argument('--clock', default='fixed',
+                        help='real, fixed[:SECONDS] or replay:RECORDING, which measures every recorded frame')
+    parser.add_argument('--baseline', help='previous report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown counted as a regression')
+    parser.add_argument('--output', help='write the report to a file instead of stdout')
+    arguments = parser.parse_args(argv)
+
+    examples = arguments.examples or sorted(glob.glob(os.path.join(EXAMPLE_DIRECTORY, 'Chapter*.py')))
+    if arguments.clock.startswith('replay:'):
+        # A replay measures the recording from its first frame to its last
+        arguments.frames = len(open_clock(arguments.clock))
+    run_benchmark = benchmark_windowed if arguments.windowed else benchmark_headless
+    results = {}
+    for path in examples:
+        application_class = load_application_class(path)
+        result = run_benchmark(application_class, arguments.frames, arguments.warmup, *arguments.size,
+                               gpu_timing=arguments.gpu_timing, clock=arguments.clock)
+        result['example'] = os.path.basename(path)
+        results[application_class.__name__] = result
+    report = {'mode': 'windowed' if arguments.windowed else 'headless', 'frames': arguments.frames,
+              'size': list(arguments.size), 'clock': arguments.clock, 'results': results}
+    regressions = []
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        report['comparison'], regressions = compare(results, baseline['results'], arguments.threshold)
+        report['regressions'] = regressions
+
+    text = json.dumps(report, indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    else:
+        print(text)
+    # Non-zero exit code when anything got slower than the threshold allows
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
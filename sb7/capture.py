@@ -0,0 +1,211 @@
+"""
+PyOpenGL OpenGL SuperBible Frame Capture
+
+Records the frames of an example without stalling the GPU. Every frame is
+read into the next pixel buffer object of a ring with glReadPixels, which
+only queues the copy, and a fence is inserted behind it. The buffer is
+mapped once the ring comes around again, latency frames later, when the
+fence has long signalled. Its pixels are copied out and handed to a thread
+pool for encoding, and a single output thread writes the encoded frames in
+order, so the render thread only queues the readback and copies one frame.
+
+A path ending in .y4m records a YUV 4:2:0 video that ffmpeg and most players
+read directly, any other path is a directory of numbered PNG files.
+
+Author: Chase Wortman
+"""
+
+import os
+import zlib
+import ctypes
+import struct
+import collections
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from sb7.gl import (glBindBuffer, glBufferData, glClientWaitSync, glDeleteBuffers, glDeleteSync, glFenceSync,
+                    glGenBuffers, glMapBufferRange, glReadPixels, glUnmapBuffer, GL_MAP_READ_BIT,
+                    GL_PIXEL_PACK_BUFFER, GL_RGBA, GL_STREAM_READ, GL_SYNC_FLUSH_COMMANDS_BIT,
+                    GL_SYNC_GPU_COMMANDS_COMPLETE, GL_TIMEOUT_EXPIRED, GL_UNSIGNED_BYTE)
+
+# Longest wait for a fence in nanoseconds when the GPU is latency frames behind
+FENCE_TIMEOUT = 1000000000
+
+# RGBA to Y and to Cb, Cr weights, the chroma ones scaled to average four pixels
+LUMA_WEIGHTS = np.array([0.299, 0.587, 0.114, 0.0], np.float32)
+CHROMA_WEIGHTS = np.array([[-0.168736, 0.5], [-0.331264, -0.418688], [0.5, -0.081312], [0.0, 0.0]], np.float32) * 0.25
+
+
+class PngWriter(object):
+    # Frames may change size between files
+    resizable = True
+
+    def __init__(self, directory, level=1):
+        # Fast compression keeps the encoders up with the frame rate
+        self.directory = directory
+        self.level = level
+        os.makedirs(directory, exist_ok=True)
+
+    def encode(self, pixels):
+        # PNG rows go top to bottom, each after a filter type byte of zero
+        height, width = pixels.shape[:2]
+        rows = np.zeros((height, width * 3 + 1), np.uint8)
+        rows[:, 1:] = pixels[::-1, :, :3].reshape(height, width * 3)
+        header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+        return b''.join((b'\x89PNG\r\n\x1a\n', self._chunk(b'IHDR', header),
+                         self._chunk(b'IDAT', zlib.compress(rows.tobytes(), self.level)), self._chunk(b'IEND', b'')))
+
+    @staticmethod
+    def _chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    def write(self, frame, data):
+        with open(os.path.join(self.directory, 'frame_{:06d}.png'.format(frame)), 'wb') as image_file:
+            image_file.write(data)
+
+    def close(self):
+        pass
+
+
+class Y4mWriter(object):
+    # Every frame of a video has the size given in its header
+    resizable = False
+
+    def __init__(self, path, frame_rate=60):
+        self.path = path
+        self.frame_rate = frame_rate
+        self._file = None
+
+    def encode(self, pixels):
+        # Full range BT.601 as used by C420jpeg, chroma averaged over 2x2 blocks
+        height, width = pixels.shape[:2]
+        if height % 2 or width % 2:
+            pixels = np.pad(pixels, ((0, height % 2), (0, width % 2), (0, 0)), mode='edge')
+        rgba = pixels.astype(np.float32)
+        luma = rgba[:height, :width] @ LUMA_WEIGHTS
+        luma += 0.5
+        quads = rgba[0::2, 0::2] + rgba[0::2, 1::2]
+        quads += rgba[1::2, 0::2]
+        quads += rgba[1::2, 1::2]
+        chroma = quads @ CHROMA_WEIGHTS
+        chroma += 128.5
+        # Rows were read bottom to top
+        luma = luma.astype(np.uint8)[::-1]
+        chroma = np.clip(chroma, 0, 255).astype(np.uint8)[::-1]
+        return (width, height), b''.join((b'FRAME\n', luma.tobytes(), chroma[..., 0].tobytes(),
+                                          chroma[..., 1].tobytes()))
+
+    def write(self, frame, data):
+        # The first frame decides the size written to the stream header
+        (width, height), frame_data = data
+        if self._file is None:
+            self._file = open(self.path, 'wb')
+            self._file.write('YUV4MPEG2 W{} H{} F{}:1 Ip A1:1 C420jpeg\n'.format(
+                width, height, self.frame_rate).encode())
+        self._file.write(frame_data)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def open_writer(path):
+    # Pick the writer from the path
+    if path.endswith('.y4m'):
+        return Y4mWriter(path)
+    return PngWriter(path)
+
+
+class FrameCapture(object):
+    def __init__(self, writer, latency=3, workers=None, max_queued=16):
+        # Object with encode(pixels), write(frame, data) and close()
+        self.writer = writer
+        # Frames in flight before their pixels are mapped
+        self.latency = latency
+        # Encoded frames allowed to wait for the output thread before capture waits too
+        self.max_queued = max_queued
+        # Frames captured, and times the render thread had to wait for the GPU or the encoders
+        self.frames = 0
+        self.stalls = 0
+        self._encoders = ThreadPoolExecutor(workers or os.cpu_count())
+        self._output = ThreadPoolExecutor(1)
+        self._written = collections.deque()
+        self._buffers = None
+        self._size = None
+        self._pending = [None] * latency
+
+    def capture(self, width, height):
+        # Queue a readback of the bound framebuffer into the next buffer of the ring
+        if (width, height) != self._size:
+            self._resize(width, height)
+        slot = self.frames % self.latency
+        if self._pending[slot] is not None:
+            self._collect(slot)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self._buffers[slot])
+        glReadPixels(0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE, None)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self._pending[slot] = (self.frames, glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0))
+        self.frames += 1
+
+    def _resize(self, width, height):
+        # Finish frames of the old size before reallocating the ring
+        if self._size is not None and not self.writer.resizable:
+            raise ValueError('Capture to {} needs a fixed frame size'.format(type(self.writer).__name__))
+        self._flush()
+        if self._buffers is not None:
+            glDeleteBuffers(self.latency, self._buffers)
+        self._size = (width, height)
+        self._buffers = np.atleast_1d(glGenBuffers(self.latency))
+        for buffer in self._buffers:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, buffer)
+            glBufferData(GL_PIXEL_PACK_BUFFER, width * height * 4, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+
+    def _collect(self, slot):
+        frame, fence = self._pending[slot]
+        self._pending[slot] = None
+        # Only waits when the GPU runs more than latency frames behind
+        if glClientWaitSync(fence, 0, 0) == GL_TIMEOUT_EXPIRED:
+            self.stalls += 1
+            glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, FENCE_TIMEOUT)
+        glDeleteSync(fence)
+        width, height = self._size
+        size = width * height * 4
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self._buffers[slot])
+        address = glMapBufferRange(GL_PIXEL_PACK_BUFFER, 0, size, GL_MAP_READ_BIT)
+        pixels = np.frombuffer((ctypes.c_ubyte * size).from_address(address), np.uint8).reshape(height, width, 4)
+        pixels = pixels.copy()
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        # Encode in parallel, write in frame order on the output thread
+        encoded = self._encoders.submit(self.writer.encode, pixels)
+        self._written.append(self._output.submit(lambda: self.writer.write(frame, encoded.result())))
+        self._drain()
+
+    def _drain(self):
+        # Surface writer errors and keep memory bounded when the encoders fall behind
+        while self._written and (self._written[0].done() or len(self._written) > self.max_queued):
+            if not self._written[0].done():
+                self.stalls += 1
+            self._written.popleft().result()
+
+    def _flush(self):
+        # Collect every frame still in flight, oldest first
+        for frame in range(self.frames - self.latency, self.frames):
+            slot = frame % self.latency
+            if frame >= 0 and self._pending[slot] is not None:
+                self._collect(slot)
+        while self._written:
+            self._written.popleft().result()
+
+    def close(self):
+        # Write out every captured frame, the context has to be current
+        try:
+            self._flush()
+        finally:
+            self._encoders.shutdown()
+            self._output.shutdown()
+            self.writer.close()
+            if self._buffers is not None:
+                glDeleteBuffers(self.latency, self._buffers)
+                self._buffers = None
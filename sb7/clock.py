@@ -0,0 +1,174 @@
+"""
+PyOpenGL OpenGL SuperBible Clocks
+
+Clocks hand every frame its current_time. RealClock follows perf_counter,
+FixedClock advances a fixed step per frame so every run renders the same
+frames however fast it goes, and ReplayClock plays back the frame times of
+a recording, or any array of times, as fast as the frames can be rendered.
+
+An InputRecorder writes one small fixed size record per frame holding the
+frame time, the FrameState colors and offset and the tessellation level
+cap. Every input of the examples follows from the frame times, the level
+cap through the frame time controller, so replaying a recording renders
+the same workload again. Recording the replay as well and comparing the two
+files shows that it did.
+
+Usage: python -m sb7.clock recording [other_recording]
+
+Author: Chase Wortman
+"""
+
+import sys
+import time
+import numpy as np
+from sb7.framestate import FrameState
+from sb7.lod import AdaptiveTessellation
+
+# Recording files are this header followed by one record per frame
+MAGIC = b'SB7INPUT'
+VERSION = 1
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('record_size', '<u4')])
+RECORD_DTYPE = np.dtype([('time', '<f8'), ('bg_color', '<f4', 4), ('offset', '<f4', 4), ('color', '<f4', 4),
+                         ('tess_level', '<f4')])
+
+
+class RealClock(object):
+    def __init__(self):
+        self._start = None
+
+    def start(self):
+        self._start = time.perf_counter()
+
+    def tick(self):
+        # Seconds since start for the next frame
+        return time.perf_counter() - self._start
+
+    def time(self):
+        return time.perf_counter() - self._start
+
+
+class FixedClock(object):
+    def __init__(self, step=1.0 / 60.0):
+        # Seconds between consecutive frames
+        self.step = step
+        self.frame = 0
+
+    def start(self):
+        self.frame = 0
+
+    def tick(self):
+        # Frame number times the step, whatever the real time is
+        current_time = self.frame * self.step
+        self.frame += 1
+        return current_time
+
+    def time(self):
+        return self.frame * self.step
+
+
+class ReplayClock(object):
+    def __init__(self, times):
+        # Frame times, such as the time field of a recording from load_recording
+        self.times = np.asarray(times, np.float64)
+        self.frame = 0
+
+    def __len__(self):
+        return len(self.times)
+
+    def start(self):
+        self.frame = 0
+
+    def tick(self):
+        # Next recorded frame time
+        if self.frame >= len(self.times):
+            raise EOFError('Recording ends after {} frames'.format(len(self.times)))
+        current_time = float(self.times[self.frame])
+        self.frame += 1
+        return current_time
+
+    def time(self):
+        # Time of the current frame, zero when there are no times yet, as a fixed clock starts
+        if len(self.times) == 0:
+            return 0.0
+        return float(self.times[min(self.frame, len(self.times) - 1)])
+
+
+def open_clock(name=None):
+    # real, fixed, fixed:<seconds per frame> or replay:<recording>
+    kind, _, argument = (name or 'real').partition(':')
+    if kind == 'real':
+        return RealClock()
+    if kind == 'fixed':
+        return FixedClock(float(argument)) if argument else FixedClock()
+    if kind == 'replay':
+        return ReplayClock(load_recording(argument)['time'])
+    raise ValueError('Unknown clock {}'.format(name))
+
+
+class InputRecorder(object):
+    def __init__(self, path, buffer_frames=1024):
+        # Records are gathered in a block and written once it is full
+        self.frames = 0
+        self._file = open(path, 'wb')
+        header = np.zeros(1, HEADER_DTYPE)
+        header[0] = (MAGIC, VERSION, RECORD_DTYPE.itemsize)
+        header.tofile(self._file)
+        self._records = np.full(buffer_frames, np.nan, RECORD_DTYPE)
+        self._count = 0
+
+    def record(self, current_time, application):
+        # Inputs of the frame just rendered, NaN for anything the application does not have
+        record = self._records[self._count]
+        record['time'] = current_time
+        state = getattr(application, 'state', None)
+        if isinstance(state, FrameState):
+            record['bg_color'] = state.bg_color
+            record['offset'] = state.offset
+            record['color'] = state.color
+        tessellation = getattr(application, 'tessellation', None)
+        if isinstance(tessellation, AdaptiveTessellation):
+            record['tess_level'] = tessellation.max_level
+        self.frames += 1
+        self._count += 1
+        if self._count == len(self._records):
+            self._flush()
+
+    def _flush(self):
+        self._records[:self._count].tofile(self._file)
+        self._records[:self._count] = np.full(self._count, np.nan, RECORD_DTYPE)
+        self._count = 0
+
+    def close(self):
+        if self._file is not None:
+            self._flush()
+            self._file.close()
+            self._file = None
+
+
+def load_recording(path):
+    # Every record of a file written by InputRecorder
+    header = np.fromfile(path, HEADER_DTYPE, count=1)
+    if len(header) != 1 or tuple(header[0]) != (MAGIC, VERSION, RECORD_DTYPE.itemsize):
+        raise ValueError('{} is not an input recording'.format(path))
+    return np.fromfile(path, RECORD_DTYPE, offset=HEADER_DTYPE.itemsize)
+
+
+def compare_recordings(recording, other):
+    # Frames whose records differ, comparing bytes so NaN fields match
+    frames = min(len(recording), len(other))
+    first = recording[:frames].view(np.uint8).reshape(frames, -1)
+    second = other[:frames].view(np.uint8).reshape(frames, -1)
+    return np.flatnonzero((first != second).any(axis=1))
+
+
+if __name__ == '__main__':
+    recordings = [load_recording(path) for path in sys.argv[1:3]]
+    times = recordings[0]['time']
+    print('{} frames over {:.3f} s'.format(len(times), times[-1] - times[0] if len(times) else 0.0))
+    if len(recordings) == 2:
+        different = compare_recordings(*recordings)
+        lengths = '' if len(recordings[0]) == len(recordings[1]) else ', lengths {} and {}'.format(
+            len(recordings[0]), len(recordings[1]))
+        print('{} frames differ{}{}'.format(len(different), lengths,
+                                            ', first at frame {}'.format(different[0]) if len(different) else ''))
+        sys.exit(1 if len(different) or lengths else 0)
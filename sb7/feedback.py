@@ -0,0 +1,115 @@
+"""
+PyOpenGL OpenGL SuperBible Transform Feedback
+
+Captures the output of the tessellation stages once with transform feedback
+and draws it again on later frames with glDrawTransformFeedback, so the
+control and evaluation shaders only run when their result changes. The
+captured vertices come from the last stage before rasterization, the
+evaluation shader or a geometry shader after it, declared with xfb_offset
+under CAPTURE_TESS_COORD.
+
+Tessellation coordinates are captured rather than positions, and the
+TESS_COORD vertex shader applies them to the corners of every patch it
+draws. The moving offset and color of a patch therefore do not invalidate a
+capture and one capture serves every patch of the frame. The coordinates
+only change with the whole number tessellation levels, which are worked out
+on the CPU every frame to decide when to capture again.
+
+A single patch is drawn with glDrawTransformFeedback, which takes the vertex
+count from the transform feedback object without a round trip to the CPU.
+Instanced draws from the transform feedback object drop instances on Mesa
+22 llvmpipe, so every patch as an instance is drawn with
+glDrawArraysInstanced and a vertex count read once per capture from a
+primitives written query.
+
+Author: Chase Wortman
+"""
+
+import ctypes
+from sb7.gl import (glBeginQuery, glBeginTransformFeedback, glBindTransformFeedback, glBufferData, glDrawArrays,
+                    glDrawArraysInstanced, glDrawTransformFeedback, glEnableVertexAttribArray, glEndQuery,
+                    glEndTransformFeedback, glGetQueryObjectiv, glVertexAttribPointer, GL_ARRAY_BUFFER,
+                    GL_DYNAMIC_COPY, GL_FALSE, GL_FLOAT, GL_LINES, GL_PATCHES, GL_POINTS, GL_QUERY_RESULT,
+                    GL_RASTERIZER_DISCARD, GL_TRANSFORM_FEEDBACK, GL_TRANSFORM_FEEDBACK_BUFFER,
+                    GL_TRANSFORM_FEEDBACK_PRIMITIVES_WRITTEN, GL_TRIANGLES)
+from sb7.tessellator import round_levels
+
+# Vertices of a triangle patch at level 64 everywhere, the most any levels give
+MAX_VERTICES = 6144 * 3
+# Vertices captured per primitive of each transform feedback mode
+PRIMITIVE_VERTICES = {GL_POINTS: 1, GL_LINES: 2, GL_TRIANGLES: 3}
+
+
+class TessellationCapture(object):
+    def __init__(self, mode=GL_TRIANGLES, coord_location=3, max_vertices=MAX_VERTICES):
+        # Primitive the last stage emits, and where the vertex shader reads the captured coordinates
+        self.mode = mode
+        self.coord_location = coord_location
+        self.max_vertices = max_vertices
+        # Whole number levels of the captured patch, None until the first capture
+        self.levels = None
+        self.captures = 0
+        # Vertices in the buffer, read from the query the first time an instanced draw needs them
+        self.vertices = None
+        self.feedback = None
+        self.query = None
+        self.buffer = None
+        self.vao = None
+        self.capture_vao = None
+        self.gl_state = None
+
+    def create(self, application, vertex_array=None):
+        # Buffer, transform feedback and vertex arrays released with the application
+        self.gl_state = application.gl_state
+        self.buffer = application.create_buffer()
+        self.gl_state.bind_buffer(GL_ARRAY_BUFFER, self.buffer)
+        glBufferData(GL_ARRAY_BUFFER, self.max_vertices * 12, None, GL_DYNAMIC_COPY)
+        # Patches are captured without vertex arrays, so every input is a current attribute value
+        self.capture_vao = application.create_vertex_array()
+        # Captured coordinates are drawn from a vertex array of their own or one with per-instance attributes
+        self.vao = application.create_vertex_array() if vertex_array is None else vertex_array
+        self.gl_state.bind_vertex_array(self.vao)
+        glVertexAttribPointer(self.coord_location, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+        glEnableVertexAttribArray(self.coord_location)
+        # The transform feedback object keeps the buffer and the number of vertices written to it
+        self.feedback = application.create_transform_feedback()
+        glBindTransformFeedback(GL_TRANSFORM_FEEDBACK, self.feedback)
+        self.gl_state.bind_buffer_base(GL_TRANSFORM_FEEDBACK_BUFFER, 0, self.buffer)
+        glBindTransformFeedback(GL_TRANSFORM_FEEDBACK, 0)
+        self.query = application.create_query()
+
+    def invalidate(self):
+        # Capture again on the next frame, after the pipeline was relinked
+        self.levels = None
+
+    def capture(self, pipeline, outer, inner):
+        # Tessellate one patch into the buffer unless the levels round to the captured ones
+        levels = round_levels(outer, inner)
+        if levels == self.levels:
+            return False
+        self.gl_state.bind_program_pipeline(pipeline)
+        self.gl_state.bind_vertex_array(self.capture_vao)
+        self.gl_state.enable(GL_RASTERIZER_DISCARD)
+        glBindTransformFeedback(GL_TRANSFORM_FEEDBACK, self.feedback)
+        glBeginQuery(GL_TRANSFORM_FEEDBACK_PRIMITIVES_WRITTEN, self.query)
+        glBeginTransformFeedback(self.mode)
+        glDrawArrays(GL_PATCHES, 0, 3)
+        glEndTransformFeedback()
+        glEndQuery(GL_TRANSFORM_FEEDBACK_PRIMITIVES_WRITTEN)
+        glBindTransformFeedback(GL_TRANSFORM_FEEDBACK, 0)
+        self.gl_state.disable(GL_RASTERIZER_DISCARD)
+        self.levels = levels
+        self.vertices = None
+        self.captures += 1
+        return True
+
+    def draw(self, instance_count=None):
+        # Draw the captured vertices once, or once per instance of the vertex array's instanced attributes
+        self.gl_state.bind_vertex_array(self.vao)
+        if instance_count is None:
+            glDrawTransformFeedback(self.mode, self.feedback)
+            return
+        # Waits for the capture on the first draw after it, later frames reuse the count
+        if self.vertices is None:
+            self.vertices = glGetQueryObjectiv(self.query, GL_QUERY_RESULT) * PRIMITIVE_VERTICES[self.mode]
+        glDrawArraysInstanced(self.mode, 0, self.vertices, instance_count)
@@ -0,0 +1,32 @@
+"""
+PyOpenGL OpenGL SuperBible Frame State
+
+Per-frame values shared by the animated examples. The float arrays handed to
+OpenGL are allocated once and updated in place, so the render loop does not
+create new NumPy arrays on every frame.
+
+Author: Chase Wortman
+"""
+
+import math
+import numpy as np
+
+
+class FrameState(object):
+    def __init__(self):
+        # Define float arrays for background color, offset, and triangle color
+        self.bg_color = np.array([0.0, 0.0, 0.0, 1.0], 'f')
+        self.offset = np.zeros(4, 'f')
+        self.color = np.zeros(4, 'f')
+
+    def update(self, current_time):
+        # Evaluate sin and cos once and write the results in place
+        sin_time = math.sin(current_time)
+        cos_time = math.cos(current_time)
+        bg_color = self.bg_color
+        bg_color[0] = sin_time * 0.5 + 0.5
+        bg_color[1] = cos_time * 0.5 + 0.5
+        offset = self.offset
+        offset[0] = sin_time * 0.5
+        offset[1] = cos_time * 0.6
+        return self
@@ -0,0 +1,217 @@
+"""
+PyOpenGL OpenGL SuperBible Lazy GL Bindings
+
+Binds OpenGL entry points and constants on first use straight from
+PyOpenGL's raw per-version modules instead of importing OpenGL.GL, which
+builds thousands of wrappers at import time. Names are resolved when they
+are imported, e.g. from sb7.gl import glDrawArrays, GL_TRIANGLES, so each
+module only pays for the entry points it actually uses.
+
+The raw functions take C style arguments. The handful of calls that return
+values through pointers are wrapped here to behave like their OpenGL.GL
+counterparts, and shader compilation lives in sb7.shaders.
+
+Author: Chase Wortman
+"""
+
+import ctypes
+import importlib
+import numpy as np
+
+# Raw modules searched for a name, oldest version first
+VERSIONS = ('GL_1_0', 'GL_1_1', 'GL_1_2', 'GL_1_3', 'GL_1_4', 'GL_1_5', 'GL_2_0', 'GL_2_1', 'GL_3_0',
+            'GL_3_1', 'GL_3_2', 'GL_3_3', 'GL_4_0', 'GL_4_1', 'GL_4_2', 'GL_4_3', 'GL_4_4', 'GL_4_5',
+            'GL_4_6')
+# Raw extension modules searched after the core versions
+EXTENSIONS = ('KHR.parallel_shader_compile',)
+
+
+# Raw functions and constants found so far
+_resolved = {}
+
+
+def _raw(name):
+    # Find a name in the raw version modules, importing them only as needed
+    if name in _resolved:
+        return _resolved[name]
+    for module_name in ['VERSION.' + version for version in VERSIONS] + list(EXTENSIONS):
+        module = importlib.import_module('OpenGL.raw.GL.' + module_name)
+        if name in vars(module):
+            value = vars(module)[name]
+            if module_name in EXTENSIONS and callable(value):
+                value = _extension(value)
+            _resolved[name] = value
+            return value
+    raise AttributeError("module 'sb7.gl' has no attribute '{}'".format(name))
+
+
+def _extension(function):
+    # PyOpenGL checks extensions through OpenGL.GL, so look the pointer up on first call instead
+    resolved = []
+
+    def call(*arguments):
+        if not resolved:
+            from OpenGL import platform
+            pointer = platform.PLATFORM.getExtensionProcedure(function.__name__.encode())
+            if not pointer:
+                raise AttributeError('{} is not available'.format(function.__name__))
+            function_type = platform.PLATFORM.functionTypeFor(function.DLL)
+            resolved.append(function_type(function.restype, *function.argtypes)(pointer))
+        return resolved[0](*arguments)
+    call.__name__ = function.__name__
+    return call
+
+
+def __getattr__(name):
+    # Resolve and cache a GL name the first time it is used
+    if not name.startswith(('gl', 'GL_')):
+        raise AttributeError("module 'sb7.gl' has no attribute '{}'".format(name))
+    value = _raw(name)
+    globals()[name] = value
+    return value
+
+
+def _generator(name):
+    # glGen* returning the names like OpenGL.GL does
+    def generate(count):
+        names = np.zeros(count, np.uint32)
+        _raw(name)(count, names)
+        return int(names[0]) if count == 1 else names
+    generate.__name__ = name
+    return generate
+
+
+def _deleter(name):
+    # glDelete* accepting any sequence of names
+    def delete(count, names):
+        _raw(name)(count, np.ascontiguousarray(names, np.uint32))
+    delete.__name__ = name
+    return delete
+
+
+def _getter(name):
+    # glGet*iv returning a single integer
+    def get(*arguments):
+        value = np.zeros(1, np.int32)
+        _raw(name)(*(arguments + (value,)))
+        return int(value[0])
+    get.__name__ = name
+    return get
+
+
+glGenBuffers = _generator('glGenBuffers')
+glGenFramebuffers = _generator('glGenFramebuffers')
+glGenProgramPipelines = _generator('glGenProgramPipelines')
+glGenQueries = _generator('glGenQueries')
+glGenRenderbuffers = _generator('glGenRenderbuffers')
+glGenTextures = _generator('glGenTextures')
+glGenTransformFeedbacks = _generator('glGenTransformFeedbacks')
+glGenVertexArrays = _generator('glGenVertexArrays')
+glDeleteBuffers = _deleter('glDeleteBuffers')
+glDeleteFramebuffers = _deleter('glDeleteFramebuffers')
+glDeleteProgramPipelines = _deleter('glDeleteProgramPipelines')
+glDeleteQueries = _deleter('glDeleteQueries')
+glDeleteRenderbuffers = _deleter('glDeleteRenderbuffers')
+glDeleteTextures = _deleter('glDeleteTextures')
+glDeleteTransformFeedbacks = _deleter('glDeleteTransformFeedbacks')
+glDeleteVertexArrays = _deleter('glDeleteVertexArrays')
+glGetIntegerv = _getter('glGetIntegerv')
+glGetProgramiv = _getter('glGetProgramiv')
+glGetProgramPipelineiv = _getter('glGetProgramPipelineiv')
+glGetShaderiv = _getter('glGetShaderiv')
+glGetQueryObjectiv = _getter('glGetQueryObjectiv')
+
+
+def glGetQueryObjectui64v(query, pname, value):
+    # 64-bit query results into a ctypes.c_uint64
+    _raw('glGetQueryObjectui64v')(query, pname, ctypes.byref(value))
+
+
+def glGetString(name):
+    # Driver strings as bytes
+    return ctypes.string_at(_raw('glGetString')(name))
+
+
+def has_extension(name):
+    # Whether the current context advertises an extension
+    count = glGetIntegerv(_raw('GL_NUM_EXTENSIONS'))
+    return any(ctypes.string_at(_raw('glGetStringi')(_raw('GL_EXTENSIONS'), index)).decode() == name
+               for index in range(count))
+
+
+def glGetUniformLocation(program, name):
+    return _raw('glGetUniformLocation')(program, name.encode())
+
+
+def glGetProgramResourceIndex(program, interface, name):
+    return _raw('glGetProgramResourceIndex')(program, interface, name.encode())
+
+
+def glGetProgramResourceiv(program, interface, index, properties, count=None):
+    # Values of the properties of one resource, count values for a single multi-valued property
+    properties = np.ascontiguousarray(properties, np.uint32)
+    values = np.zeros(count or len(properties), np.int32)
+    _raw('glGetProgramResourceiv')(program, interface, index, len(properties), properties, len(values), None,
+                                   values)
+    return [int(value) for value in values]
+
+
+def glGetProgramResourceName(program, interface, index):
+    length = glGetProgramResourceiv(program, interface, index, [_raw('GL_NAME_LENGTH')])[0]
+    name = ctypes.create_string_buffer(max(length, 1))
+    _raw('glGetProgramResourceName')(program, interface, index, len(name), None, name)
+    return name.value.decode()
+
+
+def _source_strings(source):
+    # One element char** array holding the source text
+    text = ctypes.create_string_buffer(source.encode() if isinstance(source, str) else source)
+    return (ctypes.POINTER(ctypes.c_char) * 1)(ctypes.cast(text, ctypes.POINTER(ctypes.c_char))), text
+
+
+def glShaderSource(shader, source):
+    # Single source string for a shader
+    strings, text = _source_strings(source)
+    _raw('glShaderSource')(shader, 1, strings, None)
+
+
+def glCreateShaderProgramv(shader_type, source):
+    # Separable program from a single source string
+    strings, text = _source_strings(source)
+    return _raw('glCreateShaderProgramv')(shader_type, 1, strings)
+
+
+def glGetShaderInfoLog(shader):
+    length = glGetShaderiv(shader, _raw('GL_INFO_LOG_LENGTH'))
+    log = ctypes.create_string_buffer(max(length, 1))
+    _raw('glGetShaderInfoLog')(shader, len(log), None, log)
+    return log.value.decode(errors='replace')
+
+
+def glGetProgramInfoLog(program):
+    length = glGetProgramiv(program, _raw('GL_INFO_LOG_LENGTH'))
+    log = ctypes.create_string_buffer(max(length, 1))
+    _raw('glGetProgramInfoLog')(program, len(log), None, log)
+    return log.value.decode(errors='replace')
+
+
+def glGetProgramPipelineInfoLog(pipeline):
+    length = glGetProgramPipelineiv(pipeline, _raw('GL_INFO_LOG_LENGTH'))
+    log = ctypes.create_string_buffer(max(length, 1))
+    _raw('glGetProgramPipelineInfoLog')(pipeline, len(log), None, log)
+    return log.value.decode(errors='replace')
+
+
+def glGetProgramBinary(program):
+    # Binary format and data of a linked program
+    length = glGetProgramiv(program, _raw('GL_PROGRAM_BINARY_LENGTH'))
+    binary = np.zeros(length, np.uint8)
+    written = np.zeros(1, np.int32)
+    binary_format = np.zeros(1, np.uint32)
+    _raw('glGetProgramBinary')(program, length, written, binary_format, binary.ctypes.data_as(ctypes.c_void_p))
+    return int(binary_format[0]), binary[:written[0]]
+
+
+def glProgramBinary(program, binary_format, binary):
+    binary = np.ascontiguousarray(binary, np.uint8)
+    _raw('glProgramBinary')(program, binary_format, binary.ctypes.data_as(ctypes.c_void_p), binary.nbytes)
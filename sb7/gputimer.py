@@ -0,0 +1,134 @@
+"""
+PyOpenGL OpenGL SuperBible GPU Timer
+
+Measures how long the GPU spends on each pass of a frame with GL_TIMESTAMP
+queries. A timestamp is written at the start of the frame and at the end of
+every pass, and the queries of each frame are kept in a ring of several
+frames. Results are read back only once the ring comes around again, so
+reading them never stalls the pipeline, and samples that are still not
+available then are dropped instead of waited for.
+
+Author: Chase Wortman
+"""
+
+import csv
+import json
+import ctypes
+import collections
+import numpy as np
+from sb7.gl import (glDeleteQueries, glGenQueries, glGetQueryObjectiv, glGetQueryObjectui64v, glQueryCounter,
+                    GL_QUERY_RESULT, GL_QUERY_RESULT_AVAILABLE, GL_TIMESTAMP)
+
+# Name used for the time from the first to the last timestamp of a frame
+FRAME_PASS = 'frame'
+
+
+class GpuTimer(object):
+    def __init__(self, latency=3, max_passes=8, history=1000, sinks=()):
+        # Frames in flight before results are read, and passes timed per frame
+        self.latency = latency
+        self.max_passes = max_passes
+        # Recent results as (frame number, {pass name: milliseconds})
+        self.history = collections.deque(maxlen=history)
+        self.latest = None
+        # Objects with write(frame, timings) and close() receiving every result
+        self.sinks = list(sinks)
+        # Frames whose results were not ready in time
+        self.dropped = 0
+        self._queries = None
+        self._frame = 0
+        self._slot = 0
+        self._names = []
+        self._pending = [None] * latency
+        self._timestamp = ctypes.c_uint64()
+
+    def begin_frame(self):
+        # Queries are created on first use, once a context is current
+        if self._queries is None:
+            self._queries = np.array(glGenQueries(self.latency * (self.max_passes + 1)),
+                                     np.uint32).reshape(self.latency, self.max_passes + 1)
+        # Collect the frame that used this slot of the ring last time around
+        self._slot = self._frame % self.latency
+        if self._pending[self._slot] is not None:
+            self._collect(self._slot)
+        self._names = []
+        glQueryCounter(self._queries[self._slot, 0], GL_TIMESTAMP)
+
+    def end_pass(self, name):
+        # Time from the previous timestamp to now is charged to this pass
+        if len(self._names) < self.max_passes:
+            self._names.append(name)
+            glQueryCounter(self._queries[self._slot, len(self._names)], GL_TIMESTAMP)
+
+    def end_frame(self):
+        # Results for this frame are read latency frames from now
+        self._pending[self._slot] = (self._frame, self._names)
+        self._frame += 1
+
+    def _read(self, query):
+        glGetQueryObjectui64v(query, GL_QUERY_RESULT, self._timestamp)
+        return self._timestamp.value
+
+    def _collect(self, slot):
+        frame, names = self._pending[slot]
+        self._pending[slot] = None
+        queries = self._queries[slot]
+        # Never wait on the GPU, drop the sample if it is still in flight
+        if not glGetQueryObjectiv(queries[len(names)], GL_QUERY_RESULT_AVAILABLE):
+            self.dropped += 1
+            return
+        timestamps = [self._read(query) for query in queries[:len(names) + 1]]
+        timings = {name: (timestamps[index + 1] - timestamps[index]) / 1e6 for index, name in enumerate(names)}
+        timings[FRAME_PASS] = (timestamps[-1] - timestamps[0]) / 1e6
+        self.latest = (frame, timings)
+        self.history.append(self.latest)
+        for sink in self.sinks:
+            sink.write(frame, timings)
+
+    def average(self, name=FRAME_PASS):
+        # Mean milliseconds of a pass over the recorded history
+        values = [timings[name] for _, timings in self.history if name in timings]
+        return sum(values) / len(values) if values else 0.0
+
+    def release(self):
+        # Delete the queries and close the sinks
+        if self._queries is not None:
+            glDeleteQueries(self._queries.size, self._queries.ravel())
+            self._queries = None
+        self._pending = [None] * self.latency
+        for sink in self.sinks:
+            sink.close()
+
+
+class CsvSink(object):
+    def __init__(self, path):
+        # One row per pass per frame
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['frame', 'pass', 'gpu_ms'])
+
+    def write(self, frame, timings):
+        for name, milliseconds in timings.items():
+            self._writer.writerow([frame, name, '{:.6f}'.format(milliseconds)])
+
+    def close(self):
+        self._file.close()
+
+
+class JsonSink(object):
+    def __init__(self, path):
+        # Results are kept in memory and written when the sink is closed
+        self.path = path
+        self._frames = []
+
+    def write(self, frame, timings):
+        self._frames.append({'frame': frame, 'gpu_ms': timings})
+
+    def close(self):
+        with open(self.path, 'w') as json_file:
+            json.dump({'frames': self._frames}, json_file, indent=2)
+
+
+def open_sink(path):
+    # Pick a sink from the file extension
+    return JsonSink(path) if path.endswith('.json') else CsvSink(path)
@@ -0,0 +1,199 @@
+"""
+PyOpenGL OpenGL SuperBible Headless Rendering
+
+Runs an Application without a window against a surfaceless EGL or an OSMesa
+context, rendering into a framebuffer object. Frames are returned as NumPy
+arrays so examples can be batch rendered and timed on machines without a
+display, Mesa llvmpipe included.
+
+The OpenGL platform is picked when PyOpenGL is first imported, so
+PYOPENGL_PLATFORM must be set to egl or osmesa before that happens. The sb7
+package selects egl by itself when no display is available.
+
+Usage: python -m sb7.headless Chapter3_Tessellation.py [frames]
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+import time
+import ctypes
+import importlib.util
+import numpy as np
+from sb7.gl import (glBindFramebuffer, glBindRenderbuffer, glBindVertexArray, glCheckFramebufferStatus,
+                    glDeleteFramebuffers, glDeleteRenderbuffers, glDeleteVertexArrays, glFinish,
+                    glFramebufferRenderbuffer, glGenFramebuffers, glGenRenderbuffers, glGenVertexArrays,
+                    glReadBuffer, glReadPixels, glRenderbufferStorage, glViewport, GL_COLOR_ATTACHMENT0,
+                    GL_DEPTH24_STENCIL8, GL_DEPTH_STENCIL_ATTACHMENT, GL_FRAMEBUFFER, GL_FRAMEBUFFER_COMPLETE,
+                    GL_RENDERBUFFER, GL_RGBA, GL_RGBA8, GL_UNSIGNED_BYTE)
+from sb7.application import Application
+
+# Platform enum from EGL_MESA_platform_surfaceless
+EGL_PLATFORM_SURFACELESS_MESA = 0x31DD
+
+
+class HeadlessContext(object):
+    def __init__(self, width=800, height=800, major_version=4, minor_version=4):
+        # Size of the offscreen framebuffer
+        self.width = width
+        self.height = height
+        # Create a context for the platform PyOpenGL was loaded with
+        self.platform = os.environ.get('PYOPENGL_PLATFORM')
+        if self.platform == 'egl':
+            self._create_egl_context(major_version, minor_version)
+        elif self.platform == 'osmesa':
+            self._create_osmesa_context(major_version, minor_version)
+        else:
+            raise RuntimeError('Headless rendering needs PYOPENGL_PLATFORM set to egl or osmesa before '
+                               'OpenGL is imported')
+        # Create color and depth renderbuffers for the framebuffer object
+        self.color_buffer, self.depth_buffer = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.color_buffer)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth_buffer)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH24_STENCIL8, width, height)
+        # Attach renderbuffers to the framebuffer object every frame is drawn into
+        self.framebuffer = glGenFramebuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.framebuffer)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.color_buffer)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_STENCIL_ATTACHMENT, GL_RENDERBUFFER, self.depth_buffer)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError('Headless framebuffer is incomplete')
+        glViewport(0, 0, width, height)
+        # Core profile contexts need a vertex array bound for attributeless draws
+        self.vertex_array = glGenVertexArrays(1)
+        glBindVertexArray(self.vertex_array)
+        # Preallocated destination for read backs
+        self._pixels = np.empty((height, width, 4), np.uint8)
+
+    def _create_egl_context(self, major_version, minor_version):
+        from OpenGL import EGL
+        # Surfaceless display, no window system or device node needed
+        self._display = EGL.eglGetPlatformDisplay(EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(self._display, ctypes.pointer(major), ctypes.pointer(minor)):
+            raise RuntimeError('Unable to initialise EGL display')
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        # Compatibility profile matches the context Qt gives the windowed examples
+        attributes = (EGL.EGLint * 7)(EGL.EGL_CONTEXT_MAJOR_VERSION, major_version,
+                                      EGL.EGL_CONTEXT_MINOR_VERSION, minor_version,
+                                      EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK,
+                                      EGL.EGL_CONTEXT_OPENGL_COMPATIBILITY_PROFILE_BIT,
+                                      EGL.EGL_NONE)
+        # No config is needed since nothing is drawn to an EGL surface
+        self._context = EGL.eglCreateContext(self._display, None, EGL.EGL_NO_CONTEXT, attributes)
+        if not self._context:
+            raise RuntimeError('Unable to create EGL context')
+        EGL.eglMakeCurrent(self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, self._context)
+
+    def _create_osmesa_context(self, major_version, minor_version):
+        from OpenGL import osmesa, arrays
+        attributes = arrays.GLintArray.asArray([osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA,
+                                                osmesa.OSMESA_DEPTH_BITS, 24,
+                                                osmesa.OSMESA_PROFILE, osmesa.OSMESA_COMPAT_PROFILE,
+                                                osmesa.OSMESA_CONTEXT_MAJOR_VERSION, major_version,
+                                                osmesa.OSMESA_CONTEXT_MINOR_VERSION, minor_version,
+                                                0])
+        self._context = osmesa.OSMesaCreateContextAttribs(attributes, None)
+        if not self._context:
+            raise RuntimeError('Unable to create OSMesa context')
+        # OSMesa needs a client side buffer even though rendering goes to the framebuffer object
+        self._osmesa_buffer = arrays.GLubyteArray.zeros((self.height, self.width, 4))
+        osmesa.OSMesaMakeCurrent(self._context, self._osmesa_buffer, GL_UNSIGNED_BYTE, self.width, self.height)
+
+    def read_pixels(self, out=None):
+        # Read the framebuffer object into a top-down RGBA array, a new one unless out is given
+        glReadBuffer(GL_COLOR_ATTACHMENT0)
+        glReadPixels(0, 0, self.width, self.height, GL_RGBA, GL_UNSIGNED_BYTE, self._pixels)
+        if out is None:
+            return self._pixels[::-1].copy()
+        np.copyto(out, self._pixels[::-1])
+        return out
+
+    def destroy(self):
+        # Release the framebuffer object and the context
+        glDeleteVertexArrays(1, [self.vertex_array])
+        glDeleteFramebuffers(1, [self.framebuffer])
+        glDeleteRenderbuffers(2, [self.color_buffer, self.depth_buffer])
+        if self.platform == 'egl':
+            from OpenGL import EGL
+            EGL.eglMakeCurrent(self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self._display, self._context)
+            EGL.eglTerminate(self._display)
+        else:
+            from OpenGL import osmesa
+            osmesa.OSMesaDestroyContext(self._context)
+
+
+class HeadlessRenderer(object):
+    def __init__(self, application, width=800, height=800):
+        # Context and framebuffer object the application renders into
+        self.context = HeadlessContext(width, height)
+        # Application sees the framebuffer object size as its window size
+        self.application = application
+        self.application.on_resize(width, height)
+        self.application.initialize()
+        # Frames rendered and seconds spent on the last run
+        self.frames = 0
+        self.elapsed = 0.0
+
+    @property
+    def fps(self):
+        # Frames per second of the last run
+        return self.frames / self.elapsed if self.elapsed else 0.0
+
+    def render_frame(self):
+        # Render one frame into the framebuffer object
+        self.application.frame()
+
+    def run(self, frames, read_pixels=True):
+        # Render frames, optionally returning each one as an RGBA array
+        images = []
+        start = time.perf_counter()
+        for _ in range(frames):
+            self.render_frame()
+            if read_pixels:
+                images.append(self.context.read_pixels())
+        # Wait for the GPU so the frame rate covers all submitted work
+        glFinish()
+        self.elapsed = time.perf_counter() - start
+        self.frames = frames
+        return images
+
+    def close(self):
+        # Release application resources before the context goes away
+        self.application.release()
+        self.context.destroy()
+
+
+def load_application_class(path):
+    # Import an example script and return the Application subclass it defines
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Register the module so tools can find it again from the class
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    for value in vars(module).values():
+        if isinstance(value, type) and issubclass(value, Application) and value.__module__ == name:
+            return value
+    raise ValueError('{} does not define an Application'.format(path))
+
+
+def render(application_class, frames=1, width=800, height=800, read_pixels=True):
+    # Render frames of an application headless, returning the frames and frame rate
+    renderer = HeadlessRenderer(application_class(), width, height)
+    try:
+        images = renderer.run(frames, read_pixels)
+    finally:
+        renderer.close()
+    return images, renderer.fps
+
+
+if __name__ == '__main__':
+    # Render the example given on the command line and report its frame rate
+    application_class = load_application_class(sys.argv[1])
+    frame_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    _, fps = render(application_class, frame_count, read_pixels=False)
+    print('{}: {} frames at {:.1f} fps'.format(application_class.__name__, frame_count, fps))
@@ -0,0 +1,47 @@
+"""
+PyOpenGL OpenGL SuperBible Import Cost
+
+Measures the time and resident memory needed to import each example in a
+fresh interpreter, without creating a window or a context. Each example is
+imported five times and the fastest run is kept.
+
+Usage: python -m sb7.importcost [examples ...]
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+import glob
+import json
+import subprocess
+
+# Imports one example as a module and reports wall time and peak RSS
+MEASURE_SOURCE = """
+import sys, time, resource, importlib.util
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('example', sys.argv[1])
+spec.loader.exec_module(importlib.util.module_from_spec(spec))
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def measure(path, repeats=5):
+    # Run the import in new interpreters from the example's own directory tree
+    root = os.path.dirname(os.path.abspath(path))
+    if not os.path.isdir(os.path.join(root, 'sb7')):
+        root = os.path.dirname(root)
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.check_output([sys.executable, '-c', MEASURE_SOURCE, os.path.abspath(path)], cwd=root,
+                                         env=dict(os.environ, PYTHONPATH=root))
+        seconds, max_rss = output.split()
+        runs.append((float(seconds) * 1000.0, int(max_rss) / 1024.0))
+    milliseconds, megabytes = min(runs)
+    return {'import_ms': milliseconds, 'max_rss_mb': megabytes}
+
+
+if __name__ == '__main__':
+    directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    examples = sys.argv[1:] or sorted(glob.glob(os.path.join(directory, 'Chapter*.py')))
+    print(json.dumps({os.path.basename(path): measure(path) for path in examples}, indent=2))
@@ -0,0 +1,50 @@
+"""
+PyOpenGL OpenGL SuperBible Indirect Drawing
+
+Many draws described in an indirect command buffer and submitted with one
+glMultiDrawArraysIndirect call. Every command uses its own base instance,
+so the per-instance offset and color attributes of InstancedAttributes act
+as per-draw parameters without any change to the shaders.
+
+Author: Chase Wortman
+"""
+
+import numpy as np
+from sb7.gl import glBufferData, glMultiDrawArraysIndirect, GL_DRAW_INDIRECT_BUFFER, GL_PATCHES, GL_STATIC_DRAW
+from sb7.instancing import InstancedAttributes
+
+
+class MultiDrawIndirect(object):
+    def __init__(self, draw_count, vertex_count, mode=GL_PATCHES):
+        # Number of draws, vertices per draw and primitive mode
+        self.draw_count = draw_count
+        self.mode = mode
+        # DrawArraysIndirectCommand: count, instanceCount, first, baseInstance
+        self.commands = np.zeros((draw_count, 4), np.uint32)
+        self.commands[:, 0] = vertex_count
+        self.commands[:, 1] = 1
+        self.commands[:, 2] = 0
+        # Base instance selects the per-draw attributes
+        self.commands[:, 3] = np.arange(draw_count)
+        self.attributes = InstancedAttributes(draw_count)
+        self.buffer = None
+        self.gl_state = None
+
+    def create(self, application):
+        # Per-draw attributes and the command buffer, released with the application
+        self.attributes.create(application)
+        self.buffer = application.create_buffer()
+        self.gl_state = application.gl_state
+        self.gl_state.bind_buffer(GL_DRAW_INDIRECT_BUFFER, self.buffer)
+        glBufferData(GL_DRAW_INDIRECT_BUFFER, self.commands.nbytes, self.commands, GL_STATIC_DRAW)
+
+    def update(self, current_time):
+        # Animate the offset of every draw
+        self.attributes.update(current_time)
+
+    def draw(self):
+        # Submit every command with one call
+        self.gl_state.bind_vertex_array(self.attributes.vao)
+        self.gl_state.bind_buffer(GL_DRAW_INDIRECT_BUFFER, self.buffer)
+        glMultiDrawArraysIndirect(self.mode, None, self.draw_count, 0)
+        self.attributes.fence()
@@ -0,0 +1,94 @@
+"""
+PyOpenGL OpenGL SuperBible Instancing
+
+Per-instance offset and color attributes fed from vertex buffers with a
+divisor of one, so any number of copies of a primitive is drawn with a
+single glDrawArraysInstanced call. The attributes use the same locations as
+the constant glVertexAttrib4fv inputs of the examples, so their shaders work
+unchanged in either mode. A SceneState animates every instance at once and
+writes the offsets straight into a persistently mapped PersistentBuffer.
+
+Author: Chase Wortman
+"""
+
+import math
+import ctypes
+import numpy as np
+from sb7.gl import (glBufferData, glDrawArraysInstanced, glEnableVertexAttribArray, glVertexAttribDivisor,
+                    glVertexAttribPointer, GL_ARRAY_BUFFER, GL_FALSE, GL_FLOAT, GL_STATIC_DRAW)
+from sb7.persistent import PersistentBuffer
+from sb7.scene import SceneState
+
+
+def grid_positions(count, extent=0.75):
+    # Spread count instances over a square grid centred on the origin
+    columns = max(int(math.ceil(math.sqrt(count))), 1)
+    index = np.arange(count)
+    steps = np.linspace(-extent, extent, columns) if columns > 1 else np.zeros(1)
+    positions = np.zeros((count, 4), 'f')
+    positions[:, 0] = steps[index % columns]
+    positions[:, 1] = steps[index // columns]
+    return positions
+
+
+class InstancedAttributes(object):
+    def __init__(self, count, offset_location=0, color_location=1, phases=None, speeds=None):
+        # Number of instances and the attribute locations they feed
+        self.count = count
+        self.offset_location = offset_location
+        self.color_location = color_location
+        # Fixed grid position of each instance, colored by its place on the grid
+        positions = grid_positions(count)
+        colors = np.empty((count, 4), 'f')
+        colors[:, 0] = positions[:, 0] * 0.5 + 0.5
+        colors[:, 1] = positions[:, 1] * 0.5 + 0.5
+        colors[:, 2] = 0.5
+        colors[:, 3] = 1.0
+        # Every instance circles its grid position, all in step unless given phases or speeds
+        self.scene = SceneState(positions, colors, phases, speeds)
+        # Offsets of the frame in flight are written into mapped memory, three frames round robin
+        self.offsets = PersistentBuffer((count, 4))
+        self.vao = None
+        self.color_buffer = None
+        self.gl_state = None
+
+    def create(self, application):
+        # Create the vertex array and buffers through the application so they are released with it
+        self.gl_state = application.gl_state
+        self.vao = application.create_vertex_array()
+        self.offsets.create(application)
+        for region in self.offsets.arrays:
+            self.scene.reset(region)
+        self.color_buffer = application.create_buffer()
+        self.gl_state.bind_vertex_array(self.vao)
+        # Colors are uploaded once, offsets point at the current region every frame
+        colors = self.scene.colors
+        self.gl_state.bind_buffer(GL_ARRAY_BUFFER, self.color_buffer)
+        glBufferData(GL_ARRAY_BUFFER, colors.nbytes, colors, GL_STATIC_DRAW)
+        self._setup_attribute(self.color_location, 0)
+        self.gl_state.bind_buffer(GL_ARRAY_BUFFER, self.offsets.buffer)
+        self._setup_attribute(self.offset_location, 0)
+
+    @staticmethod
+    def _setup_attribute(location, offset):
+        glVertexAttribPointer(location, 4, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(offset))
+        # Advance the attribute once per instance instead of once per vertex
+        glVertexAttribDivisor(location, 1)
+        glEnableVertexAttribArray(location)
+
+    def update(self, current_time):
+        # Animate every instance straight into the next free region
+        self.scene.update(current_time, self.offsets.next())
+        self.gl_state.bind_vertex_array(self.vao)
+        self.gl_state.bind_buffer(GL_ARRAY_BUFFER, self.offsets.buffer)
+        glVertexAttribPointer(self.offset_location, 4, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(self.offsets.offset))
+
+    def fence(self):
+        # Call after the last draw reading this frame's offsets
+        self.offsets.fence()
+
+    def draw(self, mode, first, count):
+        # Draw every instance with one call
+        self.gl_state.bind_vertex_array(self.vao)
+        glDrawArraysInstanced(mode, first, count, self.count)
+        self.fence()
@@ -0,0 +1,96 @@
+"""
+PyOpenGL OpenGL SuperBible Tessellation Level of Detail
+
+Drives the screen-space tessellation of the tessellation control shaders
+through the uniforms of shaders/edge_level.glsl. Each edge is split into
+segments of roughly pixels_per_segment pixels, up to a max_tess_level
+uniform. When a target frame time is given, a controller
+lowers that cap while frames run over budget and raises it slowly again once
+there is headroom, so software drivers keep a steady frame rate. The same
+levels are worked out on the CPU for patches tessellated without the
+tessellation stages.
+
+Author: Chase Wortman
+"""
+
+import numpy as np
+from sb7.gl import glGetUniformLocation, glProgramUniform1f, glProgramUniform2f
+
+
+class FrameTimeController(object):
+    def __init__(self, target_frame_time, initial_level=5.0, minimum_level=1.0, maximum_level=64.0,
+                 smoothing=0.1, decrease=0.9, increase=1.02, headroom=0.85):
+        # Frame time to hold in milliseconds and the allowed range of the level cap
+        self.target_frame_time = target_frame_time
+        self.level = initial_level
+        self.minimum_level = minimum_level
+        self.maximum_level = maximum_level
+        # Exponential smoothing of frame times and step sizes of the cap
+        self.smoothing = smoothing
+        self.decrease = decrease
+        self.increase = increase
+        self.headroom = headroom
+        self.frame_time = None
+
+    def update(self, frame_time):
+        # Smooth the measured frame time so single spikes do not move the cap
+        if self.frame_time is None:
+            self.frame_time = frame_time
+        else:
+            self.frame_time += (frame_time - self.frame_time) * self.smoothing
+        # Back off quickly when over budget, creep up when well under it
+        if self.frame_time > self.target_frame_time:
+            self.level = max(self.level * self.decrease, self.minimum_level)
+        elif self.frame_time < self.target_frame_time * self.headroom:
+            self.level = min(self.level * self.increase, self.maximum_level)
+        return self.level
+
+
+class AdaptiveTessellation(object):
+    def __init__(self, target_frame_time=None, max_level=5.0, pixels_per_segment=20.0):
+        # Optional controller moving the level cap to hold the target frame time
+        self.controller = FrameTimeController(target_frame_time, max_level) if target_frame_time else None
+        self.max_level = max_level
+        self.pixels_per_segment = pixels_per_segment
+        self.program = None
+        self._locations = None
+        self._uploaded = {}
+        self._last_time = None
+
+    def locate(self, program):
+        # Look up the uniforms declared by shaders/edge_level.glsl
+        self.program = program
+        self._locations = {name: glGetUniformLocation(program, name)
+                           for name in ('max_tess_level', 'viewport_size', 'pixels_per_segment')}
+        self._uploaded = {}
+
+    def update(self, current_time, width, height):
+        # Feed the time since the previous frame to the controller
+        if self.controller is not None and self._last_time is not None:
+            self.max_level = self.controller.update((current_time - self._last_time) * 1000.0)
+        self._last_time = current_time
+        # Only upload uniforms whose values changed, there are none without a control shader
+        if self._locations is None:
+            return
+        self._set('max_tess_level', (self.max_level,))
+        self._set('viewport_size', (float(width), float(height)))
+        self._set('pixels_per_segment', (self.pixels_per_segment,))
+
+    def levels(self, corners, width, height):
+        # Outer and inner levels the control shader gives a patch with these clip space corners
+        corners = np.asarray(corners, np.float32)
+        screen = corners[:, :2] / corners[:, 3:] * np.float32(0.5) * np.array([width, height], np.float32)
+        # Outer level i belongs to the edge opposite corner i
+        edges = screen[[1, 2, 0]] - screen[[2, 0, 1]]
+        outer = np.sqrt((edges * edges).sum(axis=1)) / np.float32(self.pixels_per_segment)
+        outer = np.clip(outer, np.float32(1.0), np.float32(self.max_level))
+        return tuple(outer), outer.max()
+
+    def _set(self, name, value):
+        if self._uploaded.get(name) == value or self._locations[name] < 0:
+            return
+        if len(value) == 1:
+            glProgramUniform1f(self.program, self._locations[name], *value)
+        else:
+            glProgramUniform2f(self.program, self._locations[name], *value)
+        self._uploaded[name] = value
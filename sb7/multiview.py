@@ -0,0 +1,149 @@
+"""
+PyOpenGL OpenGL SuperBible Multi-View Rendering
+
+Draws the same scene into several views with a single draw call. The
+geometry shader is declared with layout(invocations = VIEW_COUNT), so every
+primitive runs through it once per view, and each invocation routes its
+copy to view gl_InvocationID. The views are tiles of the window selected
+with gl_ViewportIndex, or layers of an array texture selected with gl_Layer
+as when rendering the faces of a cube map.
+
+Tiles are scissored to their own viewport so wide points near a tile edge do
+not spill into the next one. Layers are the size of a tile and end copies
+each of them into its tile with glBlitFramebuffer, so both ways show the same
+pixels. Shaders pick a per-view transform with gl_InvocationID when the
+views should differ. The viewports are set again on every frame, since the
+host may reset them with glViewport before each paint.
+
+Author: Chase Wortman
+"""
+
+import math
+import numpy as np
+from sb7.gl import (glBindFramebuffer, glBindTexture, glBlitFramebuffer, glCheckFramebufferStatus, glClearBufferfv,
+                    glFramebufferTexture, glFramebufferTextureLayer, glGetIntegerv, glScissorArrayv, glTexImage3D,
+                    glTexParameteri, glViewportArrayv, GL_COLOR, GL_COLOR_ATTACHMENT0, GL_COLOR_BUFFER_BIT,
+                    GL_DRAW_FRAMEBUFFER, GL_DRAW_FRAMEBUFFER_BINDING, GL_FRAMEBUFFER_COMPLETE,
+                    GL_MAX_GEOMETRY_SHADER_INVOCATIONS, GL_MAX_VIEWPORTS, GL_NEAREST, GL_READ_FRAMEBUFFER, GL_RGBA,
+                    GL_RGBA8, GL_SCISSOR_TEST, GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, GL_TEXTURE_MIN_FILTER,
+                    GL_UNSIGNED_BYTE)
+
+
+def tile_viewports(count, width, height):
+    # x, y, width and height of count equal tiles filling rows from the top left
+    columns = max(int(math.ceil(math.sqrt(count))), 1)
+    rows = int(math.ceil(count / columns))
+    tile_width = width // columns
+    tile_height = height // rows
+    index = np.arange(count)
+    tiles = np.empty((count, 4), 'f')
+    tiles[:, 0] = index % columns * tile_width
+    tiles[:, 1] = height - (index // columns + 1) * tile_height
+    tiles[:, 2] = tile_width
+    tiles[:, 3] = tile_height
+    return tiles
+
+
+class MultiView(object):
+    def __init__(self, count, layered=False):
+        # Number of views, tiles of the window or layers of an array texture
+        self.count = count
+        self.layered = layered
+        # Window size the views were laid out for, None until the first frame
+        self.size = None
+        self.tiles = None
+        self.rectangles = None
+        self.window_viewport = None
+        self.layer_viewport = None
+        self.texture = None
+        self.framebuffer = None
+        self.layer_framebuffers = []
+        self.window_framebuffer = 0
+        self.gl_state = None
+
+    @property
+    def defines(self):
+        # Shader library defines of the geometry stage
+        if self.layered:
+            return {'VIEW_COUNT': self.count, 'VIEW_LAYERS': 1}
+        return {'VIEW_COUNT': self.count}
+
+    @property
+    def view_size(self):
+        # Size of every view, which the screen-space tessellation is measured in
+        return int(self.rectangles[0, 2]), int(self.rectangles[0, 3])
+
+    def create(self, application):
+        # Check the limits of the context, then create the array texture and framebuffers of layered views
+        self.gl_state = application.gl_state
+        limit = glGetIntegerv(GL_MAX_GEOMETRY_SHADER_INVOCATIONS)
+        if not self.layered:
+            limit = min(limit, glGetIntegerv(GL_MAX_VIEWPORTS))
+        if self.count > limit:
+            raise ValueError('{} views requested, the context draws at most {}'.format(self.count, limit))
+        if not self.layered:
+            return
+        self.texture = application.create_texture()
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        self.framebuffer = application.create_framebuffer()
+        # One read framebuffer per layer to copy it to its tile
+        self.layer_framebuffers = [application.create_framebuffer() for _ in range(self.count)]
+
+    def _layout(self, width, height):
+        self.size = (width, height)
+        self.tiles = tile_viewports(self.count, width, height)
+        self.rectangles = self.tiles.astype(np.int32)
+        self.window_viewport = np.array([0.0, 0.0, width, height], 'f')
+        if not self.layered:
+            return
+        # Layers are allocated at the size of a tile and drawn to in full
+        tile_width, tile_height = self.view_size
+        self.layer_viewport = np.array([0.0, 0.0, tile_width, tile_height], 'f')
+        glBindTexture(GL_TEXTURE_2D_ARRAY, self.texture)
+        glTexImage3D(GL_TEXTURE_2D_ARRAY, 0, GL_RGBA8, tile_width, tile_height, self.count, 0, GL_RGBA,
+                     GL_UNSIGNED_BYTE, None)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, self.framebuffer)
+        glFramebufferTexture(GL_DRAW_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, self.texture, 0)
+        if glCheckFramebufferStatus(GL_DRAW_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError('Layered framebuffer is incomplete')
+        for layer, framebuffer in enumerate(self.layer_framebuffers):
+            glBindFramebuffer(GL_READ_FRAMEBUFFER, framebuffer)
+            glFramebufferTextureLayer(GL_READ_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, self.texture, 0, layer)
+
+    def begin(self, width, height, clear_color):
+        # Clear the window, lay the views out again after a resize and clear them for the draw
+        self.gl_state.disable(GL_SCISSOR_TEST)
+        glClearBufferfv(GL_COLOR, 0, clear_color)
+        if self.layered:
+            # The window may be a framebuffer object of the host, such as the one of a Qt widget
+            self.window_framebuffer = glGetIntegerv(GL_DRAW_FRAMEBUFFER_BINDING)
+        if self.size != (width, height):
+            self._layout(width, height)
+        # Set the viewports every frame, hosts such as QOpenGLWidget call glViewport before each paint and that
+        # resets every viewport index
+        if self.layered:
+            glBindFramebuffer(GL_DRAW_FRAMEBUFFER, self.framebuffer)
+            glClearBufferfv(GL_COLOR, 0, clear_color)
+            glViewportArrayv(0, 1, self.layer_viewport)
+        else:
+            # Every view draws into its tile and nothing outside it
+            glViewportArrayv(0, self.count, self.tiles)
+            glScissorArrayv(0, self.count, self.rectangles)
+            self.gl_state.enable(GL_SCISSOR_TEST)
+
+    def end(self):
+        # Put the window viewport back for whatever draws after the views
+        glViewportArrayv(0, 1, self.window_viewport)
+        # Views drawn to the window are done, layers are copied to their tiles
+        if not self.layered:
+            self.gl_state.disable(GL_SCISSOR_TEST)
+            return
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, self.window_framebuffer)
+        tile_width, tile_height = self.view_size
+        for framebuffer, (x, y, _, _) in zip(self.layer_framebuffers, self.rectangles):
+            glBindFramebuffer(GL_READ_FRAMEBUFFER, framebuffer)
+            glBlitFramebuffer(0, 0, tile_width, tile_height, x, y, x + tile_width, y + tile_height,
+                              GL_COLOR_BUFFER_BIT, GL_NEAREST)
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.window_framebuffer)
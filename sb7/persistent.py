@@ -0,0 +1,93 @@
+"""
+PyOpenGL OpenGL SuperBible Persistent Buffers
+
+Buffers created with glBufferStorage and mapped once with
+GL_MAP_PERSISTENT_BIT and GL_MAP_COHERENT_BIT, exposed as a NumPy array over
+the mapped memory. Values written to the array are what the GPU reads, with
+no glBufferSubData and no copy through PyOpenGL.
+
+The buffer is split into copies regions used round robin, one per frame. A
+fence is placed behind the draws reading a region, and the region is only
+handed out again once that fence has signalled, so the CPU never writes
+memory the GPU may still be reading. With three copies the wait only
+happens when the GPU falls two whole frames behind.
+
+create registers the buffer with the application, whose release deletes the
+outstanding fences and unmaps the buffer before it is deleted.
+
+Author: Chase Wortman
+"""
+
+import ctypes
+import numpy as np
+from sb7.gl import (glBufferStorage, glClientWaitSync, glDeleteSync, glFenceSync, glMapBufferRange, glUnmapBuffer,
+                    GL_ARRAY_BUFFER, GL_MAP_COHERENT_BIT, GL_MAP_PERSISTENT_BIT, GL_MAP_WRITE_BIT,
+                    GL_SYNC_FLUSH_COMMANDS_BIT, GL_SYNC_GPU_COMMANDS_COMPLETE, GL_TIMEOUT_EXPIRED)
+
+# Longest wait for a region in nanoseconds
+FENCE_TIMEOUT = 1000000000
+
+
+class PersistentBuffer(object):
+    def __init__(self, shape, dtype=np.float32, copies=3, target=GL_ARRAY_BUFFER):
+        # Array of shape and dtype per region, copies regions in flight
+        self.shape = tuple(np.atleast_1d(shape))
+        self.dtype = np.dtype(dtype)
+        self.copies = copies
+        self.target = target
+        self.region_size = int(np.prod(self.shape)) * self.dtype.itemsize
+        # Region written this frame and times next had to wait for the GPU
+        self.index = copies - 1
+        self.stalls = 0
+        self.buffer = None
+        self.arrays = None
+        self.gl_state = None
+        self._fences = [None] * copies
+
+    def create(self, application):
+        # Allocate immutable storage through the application and map all of it once
+        self.buffer = application.create_buffer()
+        self.gl_state = application.gl_state
+        application.track_persistent_buffer(self)
+        size = self.region_size * self.copies
+        flags = GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT
+        application.gl_state.bind_buffer(self.target, self.buffer)
+        glBufferStorage(self.target, size, None, flags)
+        address = glMapBufferRange(self.target, 0, size, flags)
+        memory = (ctypes.c_ubyte * size).from_address(address)
+        # One array per region, writes go straight to the mapping
+        self.arrays = np.frombuffer(memory, self.dtype).reshape((self.copies,) + self.shape)
+        self.arrays[...] = np.zeros((), self.dtype)
+
+    def next(self):
+        # Move to the next region once the GPU is done reading it and return its array
+        self.index = (self.index + 1) % self.copies
+        fence = self._fences[self.index]
+        if fence is not None:
+            if glClientWaitSync(fence, 0, 0) == GL_TIMEOUT_EXPIRED:
+                self.stalls += 1
+                glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, FENCE_TIMEOUT)
+            glDeleteSync(fence)
+            self._fences[self.index] = None
+        return self.arrays[self.index]
+
+    def fence(self):
+        # Call after the last draw reading the current region
+        self._fences[self.index] = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+
+    @property
+    def offset(self):
+        # Byte offset of the current region in the buffer
+        return self.index * self.region_size
+
+    def release(self):
+        # Delete outstanding fences and unmap the buffer, the buffer is deleted with the application
+        for fence in self._fences:
+            if fence is not None:
+                glDeleteSync(fence)
+        self._fences = [None] * self.copies
+        if self.arrays is not None:
+            # Drop the arrays first, they point into the mapping
+            self.arrays = None
+            self.gl_state.bind_buffer(self.target, self.buffer)
+            glUnmapBuffer(self.target)
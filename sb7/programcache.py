@@ -0,0 +1,155 @@
+"""
+PyOpenGL OpenGL SuperBible Program Cache
+
+Persistent on-disk cache of linked program binaries. Programs are keyed by a
+hash of every stage source together with GL_VENDOR, GL_RENDERER and
+GL_VERSION, so a driver update or a shader edit produces a fresh compile.
+Binaries the driver rejects are discarded and recompiled, and the least
+recently used entries are evicted once the cache grows past its size limit.
+Separable programs for program pipelines are cached under their own keys.
+
+Author: Chase Wortman
+"""
+
+import os
+import hashlib
+import struct
+import numpy as np
+from OpenGL.error import GLError
+from sb7.gl import (glCreateProgram, glDeleteProgram, glGetIntegerv, glGetProgramBinary, glGetString,
+                    glProgramBinary, glProgramParameteri, GL_NUM_PROGRAM_BINARY_FORMATS, GL_PROGRAM_SEPARABLE,
+                    GL_RENDERER, GL_TRUE, GL_VENDOR, GL_VERSION)
+from sb7.shaders import ShaderLinkError, check_linked, create_program
+
+# File extension of cached program binaries
+CACHE_SUFFIX = '.bin'
+
+
+def default_cache_directory():
+    # Per user cache directory following the XDG convention
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'sb7', 'programs')
+
+
+class ProgramCache(object):
+    def __init__(self, directory=None, max_size=64 * 1024 * 1024):
+        # Directory holding the binaries and the total size allowed on disk
+        self.directory = directory or default_cache_directory()
+        self.max_size = max_size
+        # Counters for reporting how effective the cache is
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def key(self, stages, separable=False):
+        # Hash the driver identity and every (source, shader type) stage
+        digest = hashlib.sha256()
+        for name in (GL_VENDOR, GL_RENDERER, GL_VERSION):
+            digest.update(glGetString(name) or b'')
+            digest.update(b'\0')
+        if separable:
+            digest.update(b'separable\0')
+        for source, shader_type in stages:
+            digest.update(struct.pack('<I', int(shader_type)))
+            digest.update(source.encode() if isinstance(source, str) else source)
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def path(self, key):
+        # Location of the binary for a key
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def create_program(self, *stages, separable=False):
+        # Load a cached binary if there is one, otherwise compile and store it
+        key = self.key(stages, separable)
+        program = self.load(key, separable)
+        if program is not None:
+            self.hits += 1
+            return program
+        self.misses += 1
+        # Compile shaders into a program whose binary can be retrieved
+        program = create_program(*stages, retrievable=True, separable=separable)
+        self.store(key, program)
+        return program
+
+    def load(self, key, separable=False):
+        # Read the binary format and data written by store
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as cache_file:
+                data = cache_file.read()
+        except OSError:
+            return None
+        if len(data) <= 4:
+            self._discard(path)
+            return None
+        binary_format, = struct.unpack('<I', data[:4])
+        binary = np.frombuffer(data, np.uint8, offset=4)
+        # Hand the binary to the driver, which may reject it
+        program = glCreateProgram()
+        if separable:
+            glProgramParameteri(program, GL_PROGRAM_SEPARABLE, GL_TRUE)
+        try:
+            glProgramBinary(program, binary_format, binary)
+            check_linked(program)
+        except GLError:
+            glDeleteProgram(program)
+            return self._reject(path)
+        except ShaderLinkError:
+            return self._reject(path)
+        # Mark the entry as recently used for eviction
+        os.utime(path)
+        return program
+
+    def _reject(self, path):
+        # Drop a binary the driver refused
+        self.rejected += 1
+        self._discard(path)
+        return None
+
+    def store(self, key, program):
+        # Nothing to store on drivers without binary formats
+        if not glGetIntegerv(GL_NUM_PROGRAM_BINARY_FORMATS):
+            return
+        binary_format, binary = glGetProgramBinary(program)
+        if not len(binary):
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        # Write to a temporary file first so readers never see a partial binary
+        path = self.path(key)
+        temporary_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temporary_path, 'wb') as cache_file:
+            cache_file.write(struct.pack('<I', binary_format))
+            cache_file.write(binary.tobytes())
+        os.replace(temporary_path, path)
+        self.evict()
+
+    def evict(self):
+        # Remove least recently used binaries until the cache fits its size limit
+        entries = []
+        with os.scandir(self.directory) as directory_entries:
+            for entry in directory_entries:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            self._discard(path)
+            total_size -= size
+
+    def clear(self):
+        # Remove every cached binary
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(CACHE_SUFFIX):
+                    self._discard(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _discard(path):
+        # Delete a cache file, ignoring files removed by another process
+        try:
+            os.remove(path)
+        except OSError:
+            pass
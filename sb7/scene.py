@@ -0,0 +1,57 @@
+"""
+PyOpenGL OpenGL SuperBible Scene State
+
+Animation state of many objects kept as a structure of arrays: one
+contiguous float32 array each for positions, colors, phases and speeds. An
+update evaluates the motion of FrameState for every object at once with
+NumPy ufuncs writing into preallocated scratch arrays and the output, so a
+frame costs the same handful of calls for one object or a hundred thousand
+and no per-object Python code runs at all.
+
+The output can be any (count, 4) float32 array, in particular a region of a
+PersistentBuffer, so offsets are written straight into memory the GPU reads.
+
+Author: Chase Wortman
+"""
+
+import numpy as np
+
+# Reach of the circular motion along x and y, as in FrameState
+AMPLITUDE = (0.5, 0.6)
+
+
+class SceneState(object):
+    def __init__(self, positions, colors=None, phases=None, speeds=None):
+        # Resting position and color of every object, one row each
+        self.positions = np.ascontiguousarray(positions, np.float32)
+        self.count = len(self.positions)
+        self.colors = np.zeros((self.count, 4), np.float32) if colors is None else \
+            np.ascontiguousarray(colors, np.float32)
+        # Angle at time zero and angular speed of every object's motion
+        self.phases = np.zeros(self.count, np.float32) if phases is None else \
+            np.ascontiguousarray(phases, np.float32)
+        self.speeds = np.ones(self.count, np.float32) if speeds is None else \
+            np.ascontiguousarray(speeds, np.float32)
+        # Animated positions when update is not given an output
+        self.offsets = self.positions.copy()
+        # Scratch arrays reused every frame
+        self._angles = np.empty(self.count, np.float32)
+        self._sin = np.empty(self.count, np.float32)
+        self._cos = np.empty(self.count, np.float32)
+
+    def update(self, current_time, out=None):
+        # Move every object along its circle, writing x and y of out in place
+        out = self.offsets if out is None else out
+        angles = np.multiply(self.speeds, np.float32(current_time), out=self._angles)
+        angles += self.phases
+        np.sin(angles, out=self._sin)
+        np.cos(angles, out=self._cos)
+        self._sin *= AMPLITUDE[0]
+        self._cos *= AMPLITUDE[1]
+        np.add(self.positions[:, 0], self._sin, out=out[:, 0])
+        np.add(self.positions[:, 1], self._cos, out=out[:, 1])
+        return out
+
+    def reset(self, out):
+        # Copy the resting positions into an output whose z and w update leaves alone
+        out[...] = self.positions
@@ -0,0 +1,403 @@
+"""
+PyOpenGL OpenGL SuperBible Shader Library
+
+Loads GLSL from the shared shaders directory next to the examples. The
+stage of a file is taken from its extension (.vert, .tesc, .tese, .geom,
+.frag, .comp). Before compiling, #include "name" lines are replaced by the
+named file, once per file, and keyword defines are added straight after
+#version. #line directives keep compiler messages pointing at the original
+files, which are listed with every compile error.
+
+Compiled shader objects are cached by a hash of their preprocessed source,
+so programs sharing a stage compile it once. With watching on, for example
+through SB7_HOT_RELOAD=1, poll checks the files of every program at most
+every interval seconds and relinks the programs whose files changed in
+place, compiling only the stages whose source is new. A failed compile or
+link is printed and the program keeps its previous shaders. Shader objects
+and stage programs that nothing uses after a reload are deleted.
+
+start_program compiles and links without waiting for the driver, and
+program_linked polls GL_COMPLETION_STATUS_KHR until the program is ready, so
+every program started before the first poll compiles concurrently. Without
+GL_KHR_parallel_shader_compile program_linked waits for the link instead.
+
+create_pipeline builds a program pipeline out of separable single stage
+programs, cached by source hash like shader objects. Pipelines that share a
+stage share its program, so a variant that adds or swaps one stage only
+compiles that stage, and a hot reload only swaps the stages that changed.
+
+Author: Chase Wortman
+"""
+
+import os
+import re
+import sys
+import time
+import struct
+import hashlib
+from sb7.gl import (glAttachShader, glDeleteProgram, glDeleteShader, glDetachShader, glGenProgramPipelines,
+                    glGetProgramInfoLog, glGetProgramiv, glGetProgramPipelineInfoLog, glGetProgramPipelineiv,
+                    glGetShaderInfoLog, glGetShaderiv, glLinkProgram, glMaxShaderCompilerThreadsKHR,
+                    glUseProgramStages, glValidateProgramPipeline, has_extension, GL_COMPILE_STATUS,
+                    GL_COMPLETION_STATUS_KHR, GL_COMPUTE_SHADER, GL_COMPUTE_SHADER_BIT, GL_FRAGMENT_SHADER,
+                    GL_FRAGMENT_SHADER_BIT, GL_GEOMETRY_SHADER, GL_GEOMETRY_SHADER_BIT, GL_LINK_STATUS,
+                    GL_TESS_CONTROL_SHADER, GL_TESS_CONTROL_SHADER_BIT, GL_TESS_EVALUATION_SHADER,
+                    GL_TESS_EVALUATION_SHADER_BIT, GL_VALIDATE_STATUS, GL_VERTEX_SHADER, GL_VERTEX_SHADER_BIT)
+from sb7.shaders import (ShaderCompilationError, ShaderLinkError, compile_shader, create_shader_program,
+                         link_program)
+
+# Shader type of each file extension
+STAGE_EXTENSIONS = {'.vert': GL_VERTEX_SHADER, '.tesc': GL_TESS_CONTROL_SHADER,
+                    '.tese': GL_TESS_EVALUATION_SHADER, '.geom': GL_GEOMETRY_SHADER,
+                    '.frag': GL_FRAGMENT_SHADER, '.comp': GL_COMPUTE_SHADER}
+
+# Program pipeline stage bit of each shader type
+STAGE_BITS = {GL_VERTEX_SHADER: GL_VERTEX_SHADER_BIT, GL_TESS_CONTROL_SHADER: GL_TESS_CONTROL_SHADER_BIT,
+              GL_TESS_EVALUATION_SHADER: GL_TESS_EVALUATION_SHADER_BIT, GL_GEOMETRY_SHADER: GL_GEOMETRY_SHADER_BIT,
+              GL_FRAGMENT_SHADER: GL_FRAGMENT_SHADER_BIT, GL_COMPUTE_SHADER: GL_COMPUTE_SHADER_BIT}
+
+# Preprocessor lines handled before the source reaches the driver
+INCLUDE = re.compile(r'^\s*#\s*include\s+"([^"]+)"\s*$')
+VERSION = re.compile(r'^\s*#\s*version\b')
+
+
+def default_shader_directory():
+    # The shaders directory beside the sb7 package
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'shaders')
+
+
+def stage_type(name):
+    # Shader type from the file extension
+    extension = os.path.splitext(name)[1]
+    if extension not in STAGE_EXTENSIONS:
+        raise ValueError('Unknown shader stage for {}'.format(name))
+    return STAGE_EXTENSIONS[extension]
+
+
+class ShaderLibrary(object):
+    def __init__(self, directory=None, watch=False, interval=0.25):
+        self.directory = directory or default_shader_directory()
+        self.watch = watch
+        self.interval = interval
+        # Shader objects compiled and reused from the cache
+        self.compiles = 0
+        self.hits = 0
+        self._sources = {}
+        self._shaders = {}
+        self._stage_programs = {}
+        # Linked programs and pipelines with their stage names, defines, shaders or programs and files
+        self._programs = {}
+        self._pipelines = {}
+        # Modification times of every file a program was built from
+        self._watched = {}
+        self._last_poll = None
+        # Whether the driver compiles in the background, checked on first use
+        self.parallel = None
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def read(self, path):
+        # File contents, read again only after the file changed
+        modified = os.stat(path).st_mtime_ns
+        if path not in self._sources or self._sources[path][0] != modified:
+            with open(path) as source_file:
+                self._sources[path] = (modified, source_file.read())
+        return self._sources[path][1]
+
+    def preprocess(self, name, defines=None):
+        # Expanded source of one stage and the files it was built from
+        files = []
+        lines = self._expand(self.path(name), files, ())
+        if defines:
+            for index, line in enumerate(lines):
+                if VERSION.match(line):
+                    # Defines follow #version, then line numbering resumes from the file
+                    header = ['#define {} {}'.format(key, value) for key, value in sorted(defines.items())]
+                    lines[index + 1:index + 1] = header + ['#line {} 0'.format(index + 2)]
+                    break
+        return '\n'.join(lines) + '\n', files
+
+    def _expand(self, path, files, parents):
+        # Replace include lines with the included files, each file only once
+        if path in parents:
+            raise ShaderCompilationError('Include cycle: {}'.format(' -> '.join(parents + (path,))))
+        index = len(files)
+        files.append(path)
+        lines = []
+        for number, line in enumerate(self.read(path).splitlines(), 1):
+            match = INCLUDE.match(line)
+            if match is None:
+                lines.append(line)
+                continue
+            included = self.path(match.group(1))
+            if included in files:
+                lines.append('')
+                continue
+            # Number the included lines as their own source string
+            lines.append('#line 1 {}'.format(len(files)))
+            lines.extend(self._expand(included, files, parents + (path,)))
+            lines.append('#line {} {}'.format(number + 1, index))
+        return lines
+
+    def stages(self, names, defines=None):
+        # (source, shader type) pairs for create_program and ProgramCache
+        return [(self.preprocess(name, defines)[0], stage_type(name)) for name in names]
+
+    @staticmethod
+    def _key(source, shader_type):
+        return hashlib.sha256(struct.pack('<I', shader_type) + source.encode()).hexdigest()
+
+    def compile(self, source, shader_type, files=(), wait=True):
+        # Reuse the shader object of an identical source
+        key = self._key(source, shader_type)
+        if key in self._shaders:
+            self.hits += 1
+            return self._shaders[key]
+        try:
+            shader = compile_shader(source, shader_type, wait)
+        except ShaderCompilationError as error:
+            raise self._compile_error(error, files) from None
+        self.compiles += 1
+        self._shaders[key] = shader
+        return shader
+
+    def _compile_error(self, error, files):
+        # Name the files behind each source string number in the log
+        names = ', '.join('{} = {}'.format(index, os.path.relpath(path, self.directory))
+                          for index, path in enumerate(files))
+        return ShaderCompilationError('{}\nSource strings: {}'.format(error, names))
+
+    def _compile_stages(self, names, defines, wait=True):
+        # Compile every stage, collecting the files they were built from
+        shaders = []
+        files = set()
+        for name in names:
+            source, stage_files = self.preprocess(name, defines)
+            shaders.append(self.compile(source, stage_type(name), stage_files, wait))
+            files.update(stage_files)
+        return shaders, files
+
+    def _add(self, records, handle, names, defines, objects, files):
+        # Remember how a program or pipeline was built and watch its files
+        records[handle] = (names, defines, objects, files)
+        for path in files:
+            self._watched.setdefault(path, os.stat(path).st_mtime_ns)
+
+    def _start_parallel(self):
+        # Check once for background compilation before the first asynchronous build
+        if self.parallel is None:
+            self.parallel = has_extension('GL_KHR_parallel_shader_compile')
+            if self.parallel:
+                # Let the driver choose how many compiler threads to use
+                glMaxShaderCompilerThreadsKHR(0xFFFFFFFF)
+
+    def create_program(self, names, defines=None):
+        # Link a program from stage files, remembering how to rebuild it
+        shaders, files = self._compile_stages(names, defines)
+        program = link_program(*shaders)
+        self._add(self._programs, program, names, defines, shaders, files)
+        return program
+
+    def start_program(self, names, defines=None):
+        # Compile and link without waiting, program_linked tells when it is ready
+        self._start_parallel()
+        shaders, files = self._compile_stages(names, defines, wait=False)
+        program = link_program(*shaders, wait=False)
+        self._add(self._programs, program, names, defines, shaders, files)
+        return program
+
+    def program_linked(self, program):
+        # Whether a started program is ready, raising its errors if it failed
+        if self.parallel and not glGetProgramiv(program, GL_COMPLETION_STATUS_KHR):
+            return False
+        if glGetProgramiv(program, GL_LINK_STATUS):
+            return True
+        names, defines, shaders, _ = self._programs.pop(program)
+        # A failed stage explains the link failure better than the link log
+        for name, shader in zip(names, shaders):
+            if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+                error = 'Shader compile failure: {}'.format(glGetShaderInfoLog(shader))
+                self._forget(shader)
+                raise self._compile_error(error, self.preprocess(name, defines)[1])
+        raise ShaderLinkError('Link failure: {}'.format(glGetProgramInfoLog(program)))
+
+    def _forget(self, shader):
+        # Drop a shader object from the cache and delete it
+        self._shaders = {key: cached for key, cached in self._shaders.items() if cached != shader}
+        glDeleteShader(shader)
+
+    def _stage_program(self, name, defines, program_cache, wait):
+        # Separable program for one stage file, shared by every pipeline using the same source
+        source, files = self.preprocess(name, defines)
+        shader_type = stage_type(name)
+        key = self._key(source, shader_type)
+        if key in self._stage_programs:
+            self.hits += 1
+            return self._stage_programs[key], files
+        try:
+            if program_cache is not None:
+                program = program_cache.create_program((source, shader_type), separable=True)
+            else:
+                program = create_shader_program(source, shader_type, wait)
+        except ShaderCompilationError as error:
+            raise self._compile_error(error, files) from None
+        self.compiles += 1
+        self._stage_programs[key] = program
+        return program, files
+
+    def _stage_programs_for(self, names, defines, program_cache=None, wait=True):
+        # Stage programs of a pipeline and the files they were built from
+        programs = []
+        files = set()
+        for name in names:
+            program, stage_files = self._stage_program(name, defines, program_cache, wait)
+            programs.append(program)
+            files.update(stage_files)
+        return programs, files
+
+    def create_pipeline(self, names, defines=None, program_cache=None, wait=True):
+        # Program pipeline using one separable program per stage file
+        if not wait:
+            self._start_parallel()
+        programs, files = self._stage_programs_for(names, defines, program_cache, wait)
+        pipeline = glGenProgramPipelines(1)
+        self._use_stages(pipeline, names, programs)
+        self._add(self._pipelines, pipeline, names, defines, programs, files)
+        return pipeline
+
+    def pipeline_linked(self, pipeline):
+        # Whether every stage of a pipeline built with wait=False is ready
+        names, defines, programs, _ = self._pipelines[pipeline]
+        if self.parallel and not all(glGetProgramiv(program, GL_COMPLETION_STATUS_KHR) for program in programs):
+            return False
+        for name, program in zip(names, programs):
+            if not glGetProgramiv(program, GL_LINK_STATUS):
+                error = 'Shader compile failure: {}'.format(glGetProgramInfoLog(program))
+                del self._pipelines[pipeline]
+                self._stage_programs = {key: cached for key, cached in self._stage_programs.items()
+                                        if cached != program}
+                glDeleteProgram(program)
+                raise self._compile_error(error, self.preprocess(name, defines)[1])
+        return True
+
+    def poll(self):
+        # Rebuild programs and pipelines whose files changed, returning those that changed
+        now = time.perf_counter()
+        if not self.watch or (self._last_poll is not None and now - self._last_poll < self.interval):
+            return [], []
+        self._last_poll = now
+        changed = set()
+        for path, modified in self._watched.items():
+            try:
+                current = os.stat(path).st_mtime_ns
+            except OSError:
+                # Editors may replace a file by removing it first, look again next time
+                continue
+            if current != modified:
+                self._watched[path] = current
+                changed.add(path)
+        if not changed:
+            return [], []
+        programs = [program for program in list(self._programs)
+                    if self._programs[program][3] & changed and self.reload(program)]
+        pipelines = [pipeline for pipeline in list(self._pipelines)
+                     if self._pipelines[pipeline][3] & changed and self.reload_pipeline(pipeline)]
+        return programs, pipelines
+
+    def reload(self, program):
+        # Rebuild one program in place from the current files, then delete the shaders it stopped using
+        try:
+            return self._reload(program)
+        finally:
+            self._release_unused()
+
+    def _reload(self, program):
+        names, defines, shaders, files = self._programs[program]
+        try:
+            new_shaders, new_files = self._compile_stages(names, defines)
+        except (ShaderCompilationError, OSError) as error:
+            print('Shader reload failed: {}'.format(error), file=sys.stderr)
+            return False
+        self._add(self._programs, program, names, defines, shaders, new_files)
+        if new_shaders == shaders:
+            return False
+        self._attach(program, shaders, new_shaders)
+        glLinkProgram(program)
+        if not glGetProgramiv(program, GL_LINK_STATUS):
+            print('Shader reload failed: Link failure: {}'.format(glGetProgramInfoLog(program)), file=sys.stderr)
+            # Put the previous shaders back so the program keeps working
+            self._attach(program, new_shaders, shaders)
+            glLinkProgram(program)
+            return False
+        self._programs[program] = (names, defines, new_shaders, new_files)
+        return True
+
+    def reload_pipeline(self, pipeline):
+        # Swap in new programs for the stages of a pipeline whose source changed, then delete the stage programs
+        # it stopped using
+        try:
+            return self._reload_pipeline(pipeline)
+        finally:
+            self._release_unused()
+
+    def _reload_pipeline(self, pipeline):
+        names, defines, programs, files = self._pipelines[pipeline]
+        try:
+            new_programs, new_files = self._stage_programs_for(names, defines)
+        except (ShaderCompilationError, OSError) as error:
+            print('Shader reload failed: {}'.format(error), file=sys.stderr)
+            return False
+        self._add(self._pipelines, pipeline, names, defines, programs, new_files)
+        if new_programs == programs:
+            return False
+        self._use_stages(pipeline, names, new_programs)
+        # Separable stages are never linked together, let the driver check the combination
+        glValidateProgramPipeline(pipeline)
+        if not glGetProgramPipelineiv(pipeline, GL_VALIDATE_STATUS):
+            log = glGetProgramPipelineInfoLog(pipeline)
+            print('Shader reload failed: Pipeline validation failure: {}'.format(log), file=sys.stderr)
+            self._use_stages(pipeline, names, programs)
+            return False
+        self._add(self._pipelines, pipeline, names, defines, new_programs, new_files)
+        return True
+
+    def _release_unused(self):
+        # Delete cached shaders no program is built from and stage programs no pipeline uses, such as the previous
+        # ones after a reload or new ones a failed reload left behind
+        shaders = {shader for record in self._programs.values() for shader in record[2]}
+        for key, shader in list(self._shaders.items()):
+            if shader not in shaders:
+                del self._shaders[key]
+                glDeleteShader(shader)
+        programs = {program for record in self._pipelines.values() for program in record[2]}
+        for key, program in list(self._stage_programs.items()):
+            if program not in programs:
+                del self._stage_programs[key]
+                glDeleteProgram(program)
+
+    @staticmethod
+    def _use_stages(pipeline, names, programs):
+        # Bind each stage program to its stage of the pipeline
+        for name, program in zip(names, programs):
+            glUseProgramStages(pipeline, STAGE_BITS[stage_type(name)], program)
+
+    @staticmethod
+    def _attach(program, old_shaders, new_shaders):
+        # Swap the shaders attached to a program
+        for shader in old_shaders:
+            glDetachShader(program, shader)
+        for shader in new_shaders:
+            glAttachShader(program, shader)
+
+    def release(self):
+        # Delete every cached shader object and stage program, the rest is deleted by its owner
+        for shader in self._shaders.values():
+            glDeleteShader(shader)
+        for program in self._stage_programs.values():
+            glDeleteProgram(program)
+        self._shaders = {}
+        self._stage_programs = {}
+        self._programs = {}
+        self._pipelines = {}
+        self._watched = {}
@@ -0,0 +1,87 @@
+"""
+PyOpenGL OpenGL SuperBible Shaders
+
+Shader compilation and program linking on top of sb7.gl, replacing
+OpenGL.GL.shaders so the examples never import the full OpenGL.GL package.
+
+Author: Chase Wortman
+"""
+
+from sb7.gl import (glAttachShader, glCompileShader, glCreateProgram, glCreateShader, glCreateShaderProgramv,
+                    glDeleteProgram, glDeleteShader, glGetProgramInfoLog, glGetProgramiv, glGetShaderInfoLog,
+                    glGetShaderiv, glLinkProgram, glProgramParameteri, glShaderSource, GL_COMPILE_STATUS,
+                    GL_LINK_STATUS, GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL_PROGRAM_SEPARABLE, GL_TRUE)
+
+
+class ShaderCompilationError(RuntimeError):
+    pass
+
+
+class ShaderLinkError(RuntimeError):
+    pass
+
+
+def compile_shader(source, shader_type, wait=True):
+    # Compile shader source of the given type, wait=False leaves checking to the caller
+    shader = glCreateShader(shader_type)
+    glShaderSource(shader, source)
+    glCompileShader(shader)
+    if wait:
+        check_compiled(shader)
+    return shader
+
+
+def check_compiled(shader):
+    # Raise ShaderCompilationError, deleting the shader, if it failed to compile
+    if not glGetShaderiv(shader, GL_COMPILE_STATUS):
+        log = glGetShaderInfoLog(shader)
+        glDeleteShader(shader)
+        raise ShaderCompilationError('Shader compile failure: {}'.format(log))
+    return shader
+
+
+def link_program(*shaders, retrievable=False, separable=False, wait=True):
+    # Link compiled shaders into a program, wait=False leaves checking to the caller
+    program = glCreateProgram()
+    if retrievable:
+        # Allow glGetProgramBinary on the linked program
+        glProgramParameteri(program, GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL_TRUE)
+    if separable:
+        # Allow binding the program to a subset of stages of a program pipeline
+        glProgramParameteri(program, GL_PROGRAM_SEPARABLE, GL_TRUE)
+    for shader in shaders:
+        glAttachShader(program, shader)
+    glLinkProgram(program)
+    if wait:
+        check_linked(program)
+    return program
+
+
+def check_linked(program):
+    # Raise ShaderLinkError, deleting the program, if it failed to link
+    if not glGetProgramiv(program, GL_LINK_STATUS):
+        log = glGetProgramInfoLog(program)
+        glDeleteProgram(program)
+        raise ShaderLinkError('Link failure: {}'.format(log))
+    return program
+
+
+def create_shader_program(source, shader_type, wait=True):
+    # Separable single stage program for program pipelines, compile errors end up in the program log
+    program = glCreateShaderProgramv(shader_type, source)
+    if wait and not glGetProgramiv(program, GL_LINK_STATUS):
+        log = glGetProgramInfoLog(program)
+        glDeleteProgram(program)
+        raise ShaderCompilationError('Shader compile failure: {}'.format(log))
+    return program
+
+
+def create_program(*stages, retrievable=False, separable=False):
+    # Compile each (source, shader type) stage and link them into a program
+    shaders = [compile_shader(source, shader_type) for source, shader_type in stages]
+    try:
+        return link_program(*shaders, retrievable=retrievable, separable=separable)
+    finally:
+        # Cleanup shaders since they aren't needed anymore
+        for shader in shaders:
+            glDeleteShader(shader)
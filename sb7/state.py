@@ -0,0 +1,75 @@
+"""
+PyOpenGL OpenGL SuperBible State Cache
+
+Remembers the value of the OpenGL state set through it and skips calls that
+would set the same value again, such as binding the program every frame
+that is already in use. Each call through PyOpenGL costs microseconds of
+Python and error checking, while a skipped one is a dictionary lookup.
+
+Nothing is known until a value has been set through the cache, so the first
+call always goes to OpenGL. Code that changes cached state directly has to
+call invalidate afterwards. The element array buffer binding belongs to the
+bound vertex array, so it is always passed through.
+
+Author: Chase Wortman
+"""
+
+from sb7.gl import (glBindBuffer, glBindBufferBase, glBindProgramPipeline, glBindVertexArray, glDisable, glEnable,
+                    glPointSize, glPolygonMode, glUseProgram, GL_ELEMENT_ARRAY_BUFFER)
+
+# Stands for state that has not been set through the cache yet
+_UNKNOWN = object()
+
+
+class GLState(object):
+    def __init__(self):
+        # Calls passed on to OpenGL and calls skipped as redundant
+        self.calls = 0
+        self.skipped = 0
+        self._values = {}
+
+    def _set(self, key, value, function, *arguments):
+        if self._values.get(key, _UNKNOWN) == value:
+            self.skipped += 1
+            return
+        function(*arguments)
+        self._values[key] = value
+        self.calls += 1
+
+    def use_program(self, program):
+        self._set('program', program, glUseProgram, program)
+
+    def bind_program_pipeline(self, pipeline):
+        self._set('pipeline', pipeline, glBindProgramPipeline, pipeline)
+
+    def bind_vertex_array(self, vertex_array):
+        self._set('vertex_array', vertex_array, glBindVertexArray, vertex_array)
+
+    def bind_buffer(self, target, buffer):
+        if target == GL_ELEMENT_ARRAY_BUFFER:
+            glBindBuffer(target, buffer)
+            self.calls += 1
+            return
+        self._set(('buffer', target), buffer, glBindBuffer, target, buffer)
+
+    def bind_buffer_base(self, target, index, buffer):
+        # Indexed bindings are not cached, but they also replace the generic binding of the target
+        glBindBufferBase(target, index, buffer)
+        self._values[('buffer', target)] = buffer
+        self.calls += 1
+
+    def point_size(self, size):
+        self._set('point_size', float(size), glPointSize, size)
+
+    def polygon_mode(self, face, mode):
+        self._set(('polygon_mode', face), mode, glPolygonMode, face, mode)
+
+    def enable(self, capability):
+        self._set(('enabled', capability), True, glEnable, capability)
+
+    def disable(self, capability):
+        self._set(('enabled', capability), False, glDisable, capability)
+
+    def invalidate(self):
+        # Forget every value, the next call of each kind goes to OpenGL again
+        self._values.clear()
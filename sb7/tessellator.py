@@ -0,0 +1,352 @@
+"""
+PyOpenGL OpenGL SuperBible CPU Tessellation
+
+Subdivides a triangle patch on the CPU the way the fixed function
+tessellator does for layout(triangles, equal_spacing, cw), so a patch can be
+drawn as an ordinary indexed triangle mesh on contexts where the
+tessellation stages are slow, as on software rasterizers, or missing.
+
+Points are placed with the same 16 bit fixed point arithmetic and the rings
+are stitched in the same order and with the same diagonals as the reference
+tessellator Mesa uses, so the wireframe drawn from the mesh matches the one
+drawn from GL_PATCHES pixel for pixel. Every point is a tessellation
+coordinate, the vertex shader applies it to the patch corners just like the
+tessellation evaluation shader does with gl_TessCoord.
+
+Meshes depend only on the four tessellation levels, so they are built once
+per set of levels and the most recently used ones are kept for reuse. The
+arrays of a cached mesh are read-only, callers copy them to change them. Running the module draws every
+other path of the tessellation examples and compares it with the
+tessellation stages.
+
+Usage: python -m sb7.tessellator [size ...]
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+import time
+import ctypes
+import functools
+import numpy as np
+from sb7.gl import (glBufferData, glDrawElements, glDrawElementsInstanced, glEnableVertexAttribArray, glFinish,
+                    glGetIntegerv, glVertexAttribPointer, has_extension, GL_ARRAY_BUFFER, GL_ELEMENT_ARRAY_BUFFER,
+                    GL_FALSE, GL_FLOAT, GL_MAJOR_VERSION, GL_STATIC_DRAW, GL_TRIANGLES, GL_UNSIGNED_INT)
+
+# Tessellator fixed point, 16 fraction bits
+FIXED_ONE = 1 << 16
+FIXED_ONE_HALF = FIXED_ONE >> 1
+FIXED_ONE_THIRD = 0x5555
+FIXED_TWO_THIRDS = 0xAAAA
+# Range of tessellation levels, equal_spacing rounds up to a whole number within it
+MIN_LEVEL = 1
+MAX_LEVEL = 64
+# Order in which the points of half an edge appear as its level rises, used to stitch rings of different levels
+FINAL_POINT_POSITIONS = (0, 32, 16, 8, 17, 4, 18, 9, 19, 2, 20, 10, 21, 5, 22, 11, 23,
+                         1, 24, 12, 25, 6, 26, 13, 27, 3, 28, 14, 29, 7, 30, 15, 31)
+# Corners of the triangles joining two regular rings, as offsets from the inner segment along the edge and whether
+# they are on the outer ring: two triangles before the middle, two after it, then the last one of the edge
+STRIP_POINTS = np.array([[1, 1, 0], [1, 2, 1], [0, 1, 2], [0, 2, 1], [1, 2, 0]])
+STRIP_OUTSIDE = np.array([[True, False, False], [True, True, False], [False, True, True], [False, True, False],
+                          [True, True, False]])
+# Meshes kept for the most recently used levels
+MESH_CACHE_SIZE = 256
+# Examples that draw along other paths than the tessellation stages, and those paths
+EXAMPLE_PATHS = (('Chapter3_Tessellation.py', ('mesh', 'capture')), ('Chapter3_GeometryShaders.py', ('capture',)))
+
+
+def round_levels(outer, inner):
+    # Clamp the levels and round them up as equal_spacing does
+    levels = np.ceil(np.clip(np.asarray(tuple(outer) + (inner,), np.float32), MIN_LEVEL, MAX_LEVEL))
+    return tuple(int(level) for level in levels)
+
+
+def _place_points(segments, points):
+    # Fixed point position of points along an edge split into whole segments, mirrored about the middle
+    reciprocal = (FIXED_ONE + segments // 2) // segments
+    points = np.asarray(points, np.int64)
+    locations = np.where(2 * points < segments, points * reciprocal, FIXED_ONE - (segments - points) * reciprocal)
+    locations[2 * points == segments] = FIXED_ONE_HALF
+    return locations
+
+
+def _outer_ring(levels):
+    # Points of the outer edges clockwise from V, without the last point of each edge
+    u, v = [], []
+    for edge, segments in enumerate(levels):
+        points = np.arange(segments)
+        # Edges U=0 and V=1-U run backwards along their parameter
+        params = _place_points(segments, points if edge & 1 else segments - points)
+        if edge == 0:
+            u.append(np.zeros(segments, np.int64))
+            v.append(params)
+        else:
+            u.append(params)
+            v.append(np.zeros(segments, np.int64) if edge == 1 else FIXED_ONE - params)
+    return np.concatenate(u), np.concatenate(v)
+
+
+def _inner_ring(segments, ring):
+    # Points of one inner ring clockwise, its edges are parallel to the outer ones
+    perpendicular = (int(_place_points(segments, [ring])[0]) * FIXED_TWO_THIRDS + FIXED_ONE_HALF) >> 16
+    shift = (perpendicular + 1) // 2
+    end = segments - ring
+    points = np.arange(ring, end)
+    forward = _place_points(segments, points) - shift
+    backward = _place_points(segments, end - (points - ring)) - shift
+    constant = np.full(len(points), perpendicular, np.int64)
+    u = np.concatenate((constant, forward, backward))
+    v = np.concatenate((backward, constant, FIXED_ONE - backward - perpendicular))
+    return u, v
+
+
+def _ring_edges(start, edge_segments):
+    # Point indices of every edge of a ring, each ending on the first point of the next edge
+    size = max(sum(edge_segments), 1)
+    edges, first = [], 0
+    for segments in edge_segments:
+        edges.append(start + (first + np.arange(segments + 1)) % size)
+        first += segments
+    return edges
+
+
+def _stitch_transition(inside, inside_half, inside_odd, outside, outside_half, outside_odd):
+    # Join two edges of arbitrary levels, inserting points in the order the levels would add them
+    triangles = []
+    i = o = 0
+
+    def advance_outside():
+        triangles.append((outside[o], outside[o + 1], inside[i]))
+        return o + 1
+
+    def advance_inside():
+        triangles.append((inside[i], outside[o], inside[i + 1]))
+        return i + 1
+
+    if FINAL_POINT_POSITIONS[0] < outside_half:
+        o = advance_outside()
+    for position in FINAL_POINT_POSITIONS[1:]:
+        if position < inside_half:
+            i = advance_inside()
+        if position < outside_half:
+            o = advance_outside()
+    # Middle of the edges, depending on which of them has a point there
+    if inside_odd != outside_odd or inside_odd:
+        if inside_odd == outside_odd:
+            triangles.append((inside[i], outside[o], inside[i + 1]))
+            triangles.append((inside[i + 1], outside[o], outside[o + 1]))
+            i, o = i + 1, o + 1
+        elif not inside_odd:
+            triangles.append((inside[i], outside[o], outside[o + 1]))
+            o += 1
+        else:
+            i = advance_inside()
+    for position in FINAL_POINT_POSITIONS[:0:-1]:
+        if position < outside_half:
+            o = advance_outside()
+        if position < inside_half:
+            i = advance_inside()
+    if FINAL_POINT_POSITIONS[0] < outside_half:
+        advance_outside()
+    return np.array(triangles, np.int64).reshape(-1, 3)
+
+
+def _stitch_regular(segments, rings, inside_starts):
+    # Join every inner edge from the second ring on to the edge one ring further out, diagonals mirrored about the
+    # middle, as one array of triangles in ring and then edge order
+    inside_segments = np.repeat(segments - 2 * rings, 3)
+    outside_starts = np.repeat(inside_starts - 3 * (inside_segments[::3] + 2), 3)
+    inside_starts = np.repeat(inside_starts, 3)
+    edges = np.tile(np.arange(3), len(rings))
+    # An inner edge of n segments takes a triangle at each end and two for every segment, strip is the edge of
+    # every triangle, t its place along the edge and p the inner segment it belongs to
+    counts = 2 * inside_segments + 2
+    strip = np.repeat(np.arange(len(edges)), counts)
+    t = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    n = inside_segments[strip]
+    p = (t - 1) // 2
+    # Corner pattern of every triangle, the diagonal leans the other way past the middle of the edge and the first
+    # triangle is laid out like the second one of the segment before the edge
+    pattern = np.where(p < (n + 1) // 2, 0, 2) + (t - 1) % 2
+    pattern[t == 0] = 1
+    pattern[t == counts[strip] - 1] = 4
+    points = p[:, None] + STRIP_POINTS[pattern]
+    inside = inside_starts[strip, None] + (edges[strip, None] * n[:, None] + points) % np.maximum(3 * n, 1)[:, None]
+    outside = outside_starts[strip, None] + (edges[strip, None] * (n + 2)[:, None] + points) % (3 * (n + 2))[:, None]
+    return np.where(STRIP_OUTSIDE[pattern], outside, inside)
+
+
+def _read_only(*arrays):
+    # Cached meshes are shared by every caller, so none of them may change one in place
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+@functools.lru_cache(maxsize=MESH_CACHE_SIZE)
+def tessellate_triangle(outer0, outer1, outer2, inner):
+    # Tessellation coordinates and triangles of a patch at whole number levels, in the order OpenGL draws them
+    outer = (outer0, outer1, outer2)
+    if outer == (1, 1, 1) and inner == 1:
+        coords = np.array([[0.0, 1.0, 0.0], [0.0, 0.0, 1.0], [1.0, 0.0, 0.0]], np.float32)
+        return _read_only(coords, np.array([[0, 2, 1]], np.uint32))
+    # An inner level of one is split like two so the outer edges have a point to meet
+    segments = max(inner, 2)
+    inside_odd = bool(segments & 1)
+    u, v = _outer_ring(outer)
+    rings = [u], [v]
+    point_count = segments + 1
+    for ring in range(1, point_count >> 1):
+        ring_u, ring_v = _inner_ring(segments, ring)
+        rings[0].append(ring_u)
+        rings[1].append(ring_v)
+    if not inside_odd:
+        rings[0].append(np.array([FIXED_ONE_THIRD]))
+        rings[1].append(np.array([FIXED_ONE_THIRD]))
+    u, v = np.concatenate(rings[0]), np.concatenate(rings[1])
+    # Stitch the first inner ring to the outer edges, then every other ring to the one outside it
+    rings = np.arange(1, (point_count + 1) >> 1)
+    sizes = np.maximum(3 * (segments - 2 * rings), 1)
+    inside_starts = sum(outer) + np.cumsum(sizes) - sizes
+    outside = _ring_edges(0, outer)
+    inside = _ring_edges(inside_starts[0], (segments - 2,) * 3)
+    triangles = [_stitch_transition(inside[edge], segments // 2, inside_odd,
+                                    outside[edge], outer[edge] // 2, bool(outer[edge] & 1)) for edge in range(3)]
+    triangles.append(_stitch_regular(segments, rings[1:], inside_starts[1:]))
+    if inside_odd:
+        # Innermost ring is a single triangle
+        triangles.append(inside_starts[-1] + np.arange(3)[None])
+    # Fixed point to float as the tessellator hands coordinates to the evaluation shader
+    coords = np.empty((len(u), 3), np.float32)
+    coords[:, 0] = u / np.float32(FIXED_ONE)
+    coords[:, 1] = v / np.float32(FIXED_ONE)
+    coords[:, 2] = np.float32(1.0) - coords[:, 0] - coords[:, 1]
+    # The reference tessellator's clockwise is the opposite winding in the OpenGL domain
+    return _read_only(coords, np.ascontiguousarray(np.concatenate(triangles).astype(np.uint32)[:, [0, 2, 1]]))
+
+
+def tessellation_supported():
+    # Whether the current context has tessellation control and evaluation stages
+    return glGetIntegerv(GL_MAJOR_VERSION) >= 4 or has_extension('GL_ARB_tessellation_shader')
+
+
+class TessellatedMesh(object):
+    def __init__(self, coord_location=2):
+        # Attribute location of the tessellation coordinate in the vertex shader
+        self.coord_location = coord_location
+        # Whole number levels of the uploaded mesh and its index count
+        self.levels = None
+        self.index_count = 0
+        self.vao = None
+        self.coord_buffer = None
+        self.index_buffer = None
+        self.gl_state = None
+
+    def create(self, application, vertex_array=None):
+        # Buffers released with the application, an existing vertex array adds per-instance attributes
+        self.gl_state = application.gl_state
+        self.vao = application.create_vertex_array() if vertex_array is None else vertex_array
+        self.coord_buffer = application.create_buffer()
+        self.index_buffer = application.create_buffer()
+        self.gl_state.bind_vertex_array(self.vao)
+        self.gl_state.bind_buffer(GL_ARRAY_BUFFER, self.coord_buffer)
+        glVertexAttribPointer(self.coord_location, 3, GL_FLOAT, GL_FALSE, 0, ctypes.c_void_p(0))
+        glEnableVertexAttribArray(self.coord_location)
+        # The element array binding is stored in the vertex array
+        self.gl_state.bind_buffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+
+    def update(self, outer, inner):
+        # Upload the mesh for these levels unless they round to the ones already uploaded
+        levels = round_levels(outer, inner)
+        if levels == self.levels:
+            return
+        coords, triangles = tessellate_triangle(*levels)
+        self.gl_state.bind_buffer(GL_ARRAY_BUFFER, self.coord_buffer)
+        glBufferData(GL_ARRAY_BUFFER, coords.nbytes, coords, GL_STATIC_DRAW)
+        self.gl_state.bind_vertex_array(self.vao)
+        self.gl_state.bind_buffer(GL_ELEMENT_ARRAY_BUFFER, self.index_buffer)
+        glBufferData(GL_ELEMENT_ARRAY_BUFFER, triangles.nbytes, triangles, GL_STATIC_DRAW)
+        self.levels = levels
+        self.index_count = triangles.size
+
+    def draw(self, instance_count=None):
+        # Draw the mesh once, or once per instance of the vertex array's instanced attributes
+        self.gl_state.bind_vertex_array(self.vao)
+        if instance_count is None:
+            glDrawElements(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0))
+        else:
+            glDrawElementsInstanced(GL_TRIANGLES, self.index_count, GL_UNSIGNED_INT, ctypes.c_void_p(0),
+                                    instance_count)
+
+
+class FastestPath(object):
+    def __init__(self, paths, trial_frames=8):
+        # Ways of drawing the same frame, each timed for trial_frames before the fastest is kept
+        self.paths = tuple(paths)
+        self.trial_frames = trial_frames
+        self.times = {path: [] for path in self.paths}
+        # Path of the current frame, fixed once chosen is set
+        self.path = self.paths[0]
+        self.chosen = self.path if len(self.paths) == 1 else None
+        self._start = None
+
+    def begin(self):
+        # Path to draw this frame with, trial frames start with the previous frame finished
+        if self.chosen is None:
+            glFinish()
+            self._start = time.perf_counter()
+        return self.path
+
+    def end(self):
+        # Include the GPU work of the frame, then move on to the next path on trial
+        if self.chosen is not None:
+            return
+        glFinish()
+        self.times[self.path].append(time.perf_counter() - self._start)
+        if all(len(times) >= self.trial_frames for times in self.times.values()):
+            # Medians leave out the first frames compiling shader variants
+            self.chosen = min(self.paths, key=lambda path: np.median(self.times[path]))
+            self.path = self.chosen
+        else:
+            self.path = self.paths[(self.paths.index(self.path) + 1) % len(self.paths)]
+
+
+def render_path(filename, path, size, patch_count=1, times=(0.0, 0.3, 1.7, 2.9)):
+    # Frames an example draws headless along one tessellation path
+    from sb7.benchmark import EXAMPLE_DIRECTORY
+    from sb7.headless import HeadlessRenderer, load_application_class
+    application_class = load_application_class(os.path.join(EXAMPLE_DIRECTORY, filename))
+    application = application_class()
+    application.tessellation_path = path
+    application.patch_count = patch_count
+    renderer = HeadlessRenderer(application, size, size)
+    images = []
+    try:
+        for current_time in times:
+            application.render(current_time)
+            images.append(renderer.context.read_pixels())
+    finally:
+        renderer.close()
+    return images
+
+
+def check_paths(filename, paths, size, patch_count=1):
+    # Number of pixels each path draws differently from the tessellation stages of the example
+    expected = render_path(filename, 'shader', size, patch_count)
+    return {path: sum(int(np.any(image != reference, axis=2).sum())
+                      for image, reference in zip(render_path(filename, path, size, patch_count), expected))
+            for path in paths}
+
+
+if __name__ == '__main__':
+    # Compare every path with the tessellation stages pixel for pixel at every size given, one patch and many
+    failed = False
+    for size in [int(argument) for argument in sys.argv[1:]] or [800, 200, 60]:
+        for filename, paths in EXAMPLE_PATHS:
+            for patch_count in (1, 100):
+                for path, mismatched in check_paths(filename, paths, size, patch_count).items():
+                    failed = failed or mismatched > 0
+                    print('{} {}x{} {} patches {}: {} pixels differ'.format(filename, size, size, patch_count, path,
+                                                                           mismatched))
+    sys.exit(1 if failed else 0)
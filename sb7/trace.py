@@ -0,0 +1,143 @@
+"""
+PyOpenGL OpenGL SuperBible Call Tracing
+
+Records the time spent in every OpenGL call, shader build and application
+hook of an example and writes them as Chrome trace events, which
+chrome://tracing and https://ui.perfetto.dev show as a timeline with every
+frame, the calls made inside it and a counter of GL calls per frame.
+
+Tracing replaces the gl* functions imported by the example and the sb7
+modules with timing wrappers, and puts the originals back on close. Nothing
+is wrapped unless a tracer is installed, so running without one costs
+nothing. SB7_TRACE=trace.json installs one when the application starts and
+writes the file when it is released.
+
+Usage: python -m sb7.trace trace.json
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+
+# Shader helpers traced along with the gl* functions
+SHADER_FUNCTIONS = ('compile_shader', 'link_program', 'create_program', 'create_shader_program')
+# Application hooks traced on the instance
+APPLICATION_METHODS = ('startup', 'render', 'render_loading', 'on_program_linked', 'on_pipeline_linked',
+                       'shutdown')
+# Modules whose gl* names are the bindings themselves or the tools around them
+UNTRACED_MODULES = ('sb7.gl', 'sb7.trace', 'sb7.benchmark')
+
+
+class GLTracer(object):
+    def __init__(self, path=None):
+        # File written by close, events are kept in memory until then
+        self.path = path
+        self.frames = 0
+        self.calls = 0
+        self._events = []
+        self._frame_calls = []
+        self._originals = []
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+
+    def install(self, application):
+        # Wrap the example module, every loaded sb7 module and the application hooks
+        modules = [sys.modules[type(application).__module__]]
+        modules += [module for name, module in list(sys.modules.items())
+                    if name.startswith('sb7.') and name not in UNTRACED_MODULES and module is not None]
+        for module in modules:
+            for name, value in list(vars(module).items()):
+                if name.startswith('gl') and callable(value):
+                    self._replace(module, name, self._wrap(name, 'gl', value, True))
+                elif name in SHADER_FUNCTIONS and callable(value):
+                    self._replace(module, name, self._wrap(name, 'shader', value, False))
+        for name in APPLICATION_METHODS:
+            self._replace_method(application, name, self._wrap(name, 'application', getattr(application, name),
+                                                               False))
+        self._replace_method(application, 'frame', self._wrap_frame(application.frame))
+
+    def _replace(self, owner, name, value):
+        self._originals.append((owner, name, vars(owner)[name]))
+        setattr(owner, name, value)
+
+    def _replace_method(self, application, name, value):
+        # Instance attributes shadow the class methods until close deletes them
+        self._originals.append((application, name, None))
+        setattr(application, name, value)
+
+    def _wrap(self, name, category, function, counted):
+        events = self._events
+        clock = time.perf_counter_ns
+
+        def traced(*args, **kwargs):
+            start = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                events.append((name, category, start, clock() - start))
+                if counted:
+                    self.calls += 1
+        traced.__name__ = name
+        return traced
+
+    def _wrap_frame(self, frame):
+        events = self._events
+        clock = time.perf_counter_ns
+
+        def traced_frame():
+            calls = self.calls
+            start = clock()
+            try:
+                return frame()
+            finally:
+                events.append(('frame {}'.format(self.frames), 'frame', start, clock() - start))
+                self._frame_calls.append((start, self.calls - calls))
+                self.frames += 1
+        return traced_frame
+
+    def remove(self):
+        # Put every original back, newest first so double wrapped names unwind in order
+        for owner, name, value in reversed(self._originals):
+            if value is None:
+                delattr(owner, name)
+            else:
+                setattr(owner, name, value)
+        self._originals = []
+
+    def trace_events(self):
+        # Complete events for every call and a counter event per frame, times in microseconds
+        events = [{'name': name, 'cat': category, 'ph': 'X', 'ts': (start - self._origin) / 1000.0,
+                   'dur': duration / 1000.0, 'pid': self._pid, 'tid': self._tid}
+                  for name, category, start, duration in self._events]
+        events += [{'name': 'gl calls', 'ph': 'C', 'ts': (start - self._origin) / 1000.0, 'pid': self._pid,
+                    'tid': self._tid, 'args': {'calls': calls}} for start, calls in self._frame_calls]
+        return events
+
+    def close(self):
+        # Stop tracing and write the trace file
+        self.remove()
+        if self.path:
+            with open(self.path, 'w') as trace_file:
+                json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, trace_file)
+
+
+def summarise_trace(path):
+    # Calls and total milliseconds per name from a trace file, most expensive first
+    with open(path) as trace_file:
+        events = json.load(trace_file)['traceEvents']
+    totals = {}
+    for event in events:
+        if event['ph'] == 'X' and event.get('cat') != 'frame':
+            count, total = totals.get(event['name'], (0, 0.0))
+            totals[event['name']] = (count + 1, total + event['dur'] / 1000.0)
+    return sorted(((name, count, total) for name, (count, total) in totals.items()), key=lambda entry: -entry[2])
+
+
+if __name__ == '__main__':
+    for name, count, total in summarise_trace(sys.argv[1]):
+        print('{:<32} {:>8} calls {:>10.3f} ms {:>8.2f} us/call'.format(name, count, total, total * 1000.0 / count))
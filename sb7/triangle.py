@@ -0,0 +1,118 @@
+"""
+PyOpenGL OpenGL SuperBible Tessellated Triangle
+
+Base of the examples that tessellate the moving triangle of
+shaders/triangle.glsl. It keeps the per-frame state, the screen-space
+tessellation levels and the indirect commands of many patches, and draws
+the patches through the tessellation stages or from a transform feedback
+capture of them. Examples add their own pipelines in startup and pick the
+path of every frame in render.
+
+The corners of the triangle are read from shaders/triangle.glsl, so the
+tessellation levels worked out on the CPU always measure the triangle the
+shaders draw.
+
+Author: Chase Wortman
+"""
+
+import os
+import re
+import numpy as np
+from sb7.gl import (glClearBufferfv, glDrawArrays, glGetProgramPipelineiv, glVertexAttrib4fv, GL_COLOR, GL_PATCHES,
+                    GL_TESS_CONTROL_SHADER)
+from sb7.application import Application
+from sb7.framestate import FrameState
+from sb7.lod import AdaptiveTessellation
+from sb7.shaderlib import default_shader_directory
+
+# Constructors of the corners in the triangle_vertices array
+VEC4 = re.compile(r'\bvec4\(([^()]*)\)')
+
+
+def read_triangle_vertices(path=None):
+    # Corners of the triangle as shaders/triangle.glsl declares them
+    with open(path or os.path.join(default_shader_directory(), 'triangle.glsl')) as source_file:
+        source = source_file.read()
+    corners = [[float(value) for value in match.split(',')] for match in VEC4.findall(source)]
+    if len(corners) != 3:
+        raise ValueError('Expected 3 corners in {}, found {}'.format(path or 'triangle.glsl', len(corners)))
+    return np.array(corners, np.float32)
+
+
+# Corners of the triangle in shaders/triangle.glsl
+TRIANGLE_VERTICES = read_triangle_vertices()
+# Current offset of the patch captured for instanced patches
+ORIGIN = np.zeros(4, 'f')
+
+
+class TessellatedTriangle(Application):
+    # Patches drawn per frame, more than one switches to multi-draw indirect
+    patch_count = 1
+    # Frame time in milliseconds to hold by adjusting the tessellation level cap
+    target_frame_time = None
+    # Path to draw every frame with, None times all of them and keeps the fastest
+    tessellation_path = None
+
+    def __init__(self):
+        super().__init__()
+        # Pipeline with the tessellation stages and the one drawing their capture
+        self.pipeline = None
+        self.capture_pipeline = None
+        # Per-frame arrays allocated once and updated in place
+        self.state = FrameState()
+        # Indirect draw commands when drawing many patches
+        self.patches = None
+        # Screen-space tessellation levels and their frame time controller
+        self.tessellation = AdaptiveTessellation(self.target_frame_time)
+        # Patch captured on the GPU, the moving corners of the triangle and the path of each frame
+        self.captured = None
+        self.corners = TRIANGLE_VERTICES.copy()
+        self.path = None
+
+    def on_pipeline_linked(self, pipeline):
+        # Find the tessellation level uniforms in the tessellation control stage, the other pipelines have none
+        control = glGetProgramPipelineiv(pipeline, GL_TESS_CONTROL_SHADER)
+        if control:
+            self.tessellation.locate(control)
+            # Stages that were relinked may tessellate differently
+            if self.captured is not None:
+                self.captured.invalidate()
+
+    def render_loading(self, current_time):
+        # Clear to the animated background while the pipeline is still linking
+        glClearBufferfv(GL_COLOR, 0, self.state.update(current_time).bg_color)
+
+    def render_captured(self, current_time, state):
+        if self.patches is None:
+            # Pass arrays to shader attributes, a capture is taken at the current offset
+            glVertexAttrib4fv(0, state.offset)
+            glVertexAttrib4fv(1, state.color)
+            np.add(TRIANGLE_VERTICES, state.offset, out=self.corners)
+        else:
+            # Capture at the triangle itself, instanced draws leave the current offset undefined
+            glVertexAttrib4fv(0, ORIGIN)
+        # Run the stages before rasterization only when the levels the control shader picks change
+        self.captured.capture(self.pipeline, *self.tessellation.levels(self.corners, self.width, self.height))
+        # Draw the capture with the pipeline without tessellation stages
+        self.gl_state.bind_program_pipeline(self.capture_pipeline)
+        if self.patches is not None:
+            # Animate every patch and draw the capture once per patch
+            self.patches.update(current_time)
+            self.captured.draw(self.patch_count)
+            self.patches.attributes.fence()
+        else:
+            self.captured.draw()
+
+    def render_patches(self, current_time, state):
+        # Use program pipeline for rendering
+        self.gl_state.bind_program_pipeline(self.pipeline)
+        if self.patches is not None:
+            # Animate every patch and submit all of them with one call
+            self.patches.update(current_time)
+            self.patches.draw()
+        else:
+            # Pass arrays to shader attributes
+            glVertexAttrib4fv(0, state.offset)
+            glVertexAttrib4fv(1, state.color)
+            # Draw patches from vertices in the vertex shader
+            glDrawArrays(GL_PATCHES, 0, 3)
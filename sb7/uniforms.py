@@ -0,0 +1,120 @@
+"""
+PyOpenGL OpenGL SuperBible Uniform Blocks
+
+Uniform blocks whose layout is read back from the linked program instead of
+being worked out by hand. Every member's offset, array stride and matrix
+stride come from the program interface query, and together they describe a
+NumPy structured dtype with the same padding as the std140 block. Values
+are assigned to the fields of a single record and the whole block goes to
+the GPU with one glBufferSubData per frame, however many members
+change.
+
+Arrays are padded to their stride, so an array of floats in a std140 block
+reads as (size, 4) and its values are in column 0. Matrices are stored as
+columns, a mat3 as (3, 4) including the padding of every column.
+
+Author: Chase Wortman
+"""
+
+import numpy as np
+from sb7.gl import (glGetProgramResourceIndex, glGetProgramResourceiv, glGetProgramResourceName,
+                    glBufferData, glBufferSubData, glUniformBlockBinding,
+                    GL_ACTIVE_VARIABLES, GL_ARRAY_SIZE, GL_ARRAY_STRIDE, GL_BOOL, GL_BOOL_VEC2, GL_BOOL_VEC3,
+                    GL_BOOL_VEC4, GL_BUFFER_BINDING, GL_BUFFER_DATA_SIZE, GL_DYNAMIC_DRAW, GL_FLOAT,
+                    GL_FLOAT_MAT2, GL_FLOAT_MAT2x3, GL_FLOAT_MAT2x4, GL_FLOAT_MAT3, GL_FLOAT_MAT3x2,
+                    GL_FLOAT_MAT3x4, GL_FLOAT_MAT4, GL_FLOAT_MAT4x2, GL_FLOAT_MAT4x3, GL_FLOAT_VEC2, GL_FLOAT_VEC3,
+                    GL_FLOAT_VEC4, GL_INT, GL_INT_VEC2, GL_INT_VEC3, GL_INT_VEC4, GL_INVALID_INDEX,
+                    GL_MATRIX_STRIDE, GL_NUM_ACTIVE_VARIABLES, GL_OFFSET, GL_TYPE, GL_UNIFORM, GL_UNIFORM_BLOCK,
+                    GL_UNIFORM_BUFFER, GL_UNSIGNED_INT, GL_UNSIGNED_INT_VEC2, GL_UNSIGNED_INT_VEC3,
+                    GL_UNSIGNED_INT_VEC4)
+
+# Scalar type and shape of every supported GLSL type, matrices as (columns, rows)
+UNIFORM_TYPES = {
+    GL_FLOAT: ('<f4', ()), GL_FLOAT_VEC2: ('<f4', (2,)), GL_FLOAT_VEC3: ('<f4', (3,)),
+    GL_FLOAT_VEC4: ('<f4', (4,)),
+    GL_INT: ('<i4', ()), GL_INT_VEC2: ('<i4', (2,)), GL_INT_VEC3: ('<i4', (3,)), GL_INT_VEC4: ('<i4', (4,)),
+    GL_UNSIGNED_INT: ('<u4', ()), GL_UNSIGNED_INT_VEC2: ('<u4', (2,)), GL_UNSIGNED_INT_VEC3: ('<u4', (3,)),
+    GL_UNSIGNED_INT_VEC4: ('<u4', (4,)),
+    GL_BOOL: ('<u4', ()), GL_BOOL_VEC2: ('<u4', (2,)), GL_BOOL_VEC3: ('<u4', (3,)), GL_BOOL_VEC4: ('<u4', (4,)),
+    GL_FLOAT_MAT2: ('<f4', (2, 2)), GL_FLOAT_MAT3: ('<f4', (3, 3)), GL_FLOAT_MAT4: ('<f4', (4, 4)),
+    GL_FLOAT_MAT2x3: ('<f4', (2, 3)), GL_FLOAT_MAT2x4: ('<f4', (2, 4)), GL_FLOAT_MAT3x2: ('<f4', (3, 2)),
+    GL_FLOAT_MAT3x4: ('<f4', (3, 4)), GL_FLOAT_MAT4x2: ('<f4', (4, 2)), GL_FLOAT_MAT4x3: ('<f4', (4, 3)),
+}
+# Properties read for every member of a block
+MEMBER_PROPERTIES = (GL_TYPE, GL_OFFSET, GL_ARRAY_SIZE, GL_ARRAY_STRIDE, GL_MATRIX_STRIDE)
+
+
+def block_dtype(program, name):
+    # Structured dtype laid out like the uniform block name of a linked program
+    index = glGetProgramResourceIndex(program, GL_UNIFORM_BLOCK, name)
+    if index == GL_INVALID_INDEX:
+        raise KeyError('Program {} has no uniform block {}'.format(program, name))
+    size, count = glGetProgramResourceiv(program, GL_UNIFORM_BLOCK, index,
+                                         [GL_BUFFER_DATA_SIZE, GL_NUM_ACTIVE_VARIABLES])
+    members = glGetProgramResourceiv(program, GL_UNIFORM_BLOCK, index, [GL_ACTIVE_VARIABLES], count)
+    names, formats, offsets = [], [], []
+    for member in members:
+        member_name = glGetProgramResourceName(program, GL_UNIFORM, member)
+        uniform_type, offset, array_size, array_stride, matrix_stride = glGetProgramResourceiv(
+            program, GL_UNIFORM, member, MEMBER_PROPERTIES)
+        if uniform_type not in UNIFORM_TYPES:
+            raise ValueError('Uniform {} of block {} has an unsupported type'.format(member_name, name))
+        scalar, shape = UNIFORM_TYPES[uniform_type]
+        scalar_size = np.dtype(scalar).itemsize
+        # Matrix columns are padded to the matrix stride
+        if len(shape) == 2:
+            shape = (shape[0], matrix_stride // scalar_size)
+        # Array elements are padded to the array stride
+        if member_name.endswith('[0]'):
+            member_name = member_name[:-3]
+            if len(shape) < 2:
+                shape = (array_stride // scalar_size,)
+            shape = (array_size,) + shape
+        names.append(member_name[len(name) + 1:] if member_name.startswith(name + '.') else member_name)
+        formats.append((scalar, shape))
+        offsets.append(offset)
+    return np.dtype({'names': names, 'formats': formats, 'offsets': offsets, 'itemsize': size})
+
+
+class UniformBlock(object):
+    def __init__(self, name, binding=None):
+        # Block name in the shaders and the binding point, None keeps the binding set in the shader
+        self.name = name
+        self.binding = binding
+        self.dtype = None
+        # Single record holding every member, fields are assigned before upload
+        self.values = None
+        self.buffer = None
+        self.gl_state = None
+
+    def create(self, application):
+        # Buffer released with the application, storage follows the reflected size
+        self.buffer = application.create_buffer()
+        self.gl_state = application.gl_state
+
+    def locate(self, program):
+        # Read the block layout from a linked program, keeping values of members that stay
+        index = glGetProgramResourceIndex(program, GL_UNIFORM_BLOCK, self.name)
+        if index == GL_INVALID_INDEX:
+            raise KeyError('Program {} has no uniform block {}'.format(program, self.name))
+        if self.binding is None:
+            self.binding = glGetProgramResourceiv(program, GL_UNIFORM_BLOCK, index, [GL_BUFFER_BINDING])[0]
+        else:
+            glUniformBlockBinding(program, index, self.binding)
+        dtype = block_dtype(program, self.name)
+        if dtype != self.dtype:
+            values = np.zeros((), dtype)
+            if self.values is not None:
+                for field in set(dtype.names) & set(self.dtype.names):
+                    if values[field].shape == self.values[field].shape:
+                        values[field] = self.values[field]
+            self.dtype = dtype
+            self.values = values
+            self.gl_state.bind_buffer(GL_UNIFORM_BUFFER, self.buffer)
+            glBufferData(GL_UNIFORM_BUFFER, dtype.itemsize, None, GL_DYNAMIC_DRAW)
+        self.gl_state.bind_buffer_base(GL_UNIFORM_BUFFER, self.binding, self.buffer)
+
+    def upload(self):
+        # Send every member with one call, the buffer stays bound to the block
+        self.gl_state.bind_buffer(GL_UNIFORM_BUFFER, self.buffer)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, self.dtype.itemsize, self.values)
@@ -0,0 +1,125 @@
+"""
+PyOpenGL OpenGL SuperBible Utilization
+
+Shows chapter examples in a window for a few seconds in each render mode and
+reports how busy they keep the machine. CPU utilization is the CPU time of
+the whole process, driver threads included, over the wall time, so 100%
+is one core kept busy. GPU utilization is the GPU time of the frames from
+the timer queries of a GpuTimer over the wall time, frames whose queries
+were not read back count at the average of those that were.
+
+--hide-after hides the window part way through and measures the rest of the
+run separately, which shows what a hidden or minimized window still costs.
+
+Usage: python -m sb7.utilization [--seconds S] [--modes MODE ...] [--hide-after S] [--output FILE]
+                                 [examples ...]
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from sb7.application import RENDER_MODES
+from sb7.benchmark import EXAMPLE_DIRECTORY
+from sb7.gputimer import GpuTimer
+from sb7.headless import load_application_class
+
+
+class UtilizationMeter(object):
+    def __init__(self, application):
+        # Frames painted and the GPU timer of the application being measured
+        self.application = application
+        self.frames = 0
+        self._start = None
+
+    def count(self, frame):
+        # Wrap the frame hook to count every frame the host paints
+        def counted_frame():
+            frame()
+            self.frames += 1
+        return counted_frame
+
+    def start(self):
+        # Begin a period, frames and timings before it are not counted
+        self.frames = 0
+        self.application.gpu_timer.history.clear()
+        self._start = (time.perf_counter(), time.process_time())
+
+    def stop(self):
+        # Utilization of the period since start
+        wall = time.perf_counter() - self._start[0]
+        cpu = time.process_time() - self._start[1]
+        gpu_ms = self.application.gpu_timer.average() * self.frames
+        return {'seconds': wall, 'frames': self.frames, 'fps': self.frames / wall,
+                'cpu_percent': cpu / wall * 100.0, 'gpu_percent': gpu_ms / 10.0 / wall}
+
+
+def measure(application_class, render_mode, seconds, width, height, hide_after=None):
+    # Show the example in a window and measure it while visible, then while hidden if asked to
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    from sb7.window import MainWindow
+    app = QApplication.instance() or QApplication(sys.argv)
+    application = application_class()
+    application.render_mode = render_mode
+    application.width, application.height = width, height
+    application.gpu_timer = GpuTimer(history=100000)
+    meter = UtilizationMeter(application)
+    application.frame = meter.count(application.frame)
+    report = {'render_mode': render_mode}
+    window = MainWindow(application)
+
+    def finish():
+        report['hidden' if 'visible' in report else 'visible'] = meter.stop()
+        window.close()
+        app.quit()
+
+    def hide():
+        report['visible'] = meter.stop()
+        window.hide()
+        meter.start()
+    # Let the window show before measuring
+    app.processEvents()
+    meter.start()
+    if hide_after is not None:
+        QTimer.singleShot(int(hide_after * 1000), hide)
+    QTimer.singleShot(int(seconds * 1000), finish)
+    app.exec_()
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure CPU and GPU utilization of the chapter examples')
+    parser.add_argument('examples', nargs='*', help='example scripts, every Chapter*.py by default')
+    parser.add_argument('--seconds', type=float, default=5.0, help='time each example is shown per mode')
+    parser.add_argument('--modes', nargs='+', default=list(RENDER_MODES), choices=RENDER_MODES)
+    parser.add_argument('--hide-after', type=float, help='seconds after which the window is hidden')
+    parser.add_argument('--size', type=int, nargs=2, default=(800, 800), metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--output', help='write the report to a file instead of stdout')
+    arguments = parser.parse_args(argv)
+
+    examples = arguments.examples or sorted(glob.glob(os.path.join(EXAMPLE_DIRECTORY, 'Chapter*.py')))
+    results = {}
+    for path in examples:
+        application_class = load_application_class(path)
+        results[application_class.__name__] = [measure(application_class, mode, arguments.seconds,
+                                                       *arguments.size, hide_after=arguments.hide_after)
+                                                for mode in arguments.modes]
+    report = {'seconds': arguments.seconds, 'hide_after': arguments.hide_after, 'size': list(arguments.size),
+              'cpu_count': os.cpu_count(), 'results': results}
+
+    text = json.dumps(report, indent=2)
+    if arguments.output:
+        with open(arguments.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+PyOpenGL OpenGL SuperBible Window
+
+Qt host for an Application. MainWidget owns the OpenGL context and drives
+the render loop, MainWindow wraps it in a top level window.
+
+Frames are painted back to back only while the application needs them, which
+is always for animated scenes and in continuous mode. A static scene is
+painted when Qt asks for it after the window is shown, resized or exposed,
+and when the application calls request_frame. The loop stops while the
+window is hidden, minimized or not exposed, so nothing is drawn that cannot
+be seen. Continuous mode keeps the timer running regardless, like the busy
+loop examples used before on-demand painting, to compare the two against.
+
+Author: Chase Wortman
+"""
+
+import sys
+from PyQt5.QtCore import Qt, QEvent, QSize
+from PyQt5.QtWidgets import QApplication, QMainWindow, QOpenGLWidget
+
+
+class MainWidget(QOpenGLWidget):
+    def __init__(self, application):
+        # noinspection PyArgumentList
+        super().__init__()
+        # Application rendered by this widget
+        self.application = application
+        # Set focus to window
+        self.setFocusPolicy(Qt.StrongFocus)
+        # Timer painting back to back frames, only running while they are needed and can be seen
+        self._timer = None
+        self._visible = False
+        self._exposed = True
+        self._watched_window = None
+        self._released = False
+        # Let the application ask for a frame of a static scene
+        application.frame_requested = self.update
+
+    def _schedule(self):
+        # Start or stop the frame timer to match what the application needs and whether the window can be seen,
+        # continuous mode keeps it running while hidden too
+        seen = self._visible and self._exposed or self.application.render_mode == 'continuous'
+        running = seen and not self._released and self.application.needs_frame
+        if running and self._timer is None:
+            self._timer = self.startTimer(0)
+        elif not running and self._timer is not None:
+            self.killTimer(self._timer)
+            self._timer = None
+
+    def timerEvent(self, event):
+        # Update widget at each timer event
+        self.update()
+
+    def showEvent(self, event):
+        # Shown again, also after the window was restored from minimized
+        self._visible = True
+        # The top level window reports when it stops being exposed, e.g. covered on some platforms
+        window = self.window().windowHandle()
+        if window is not None and window is not self._watched_window:
+            window.installEventFilter(self)
+            self._watched_window = window
+        self._schedule()
+
+    def hideEvent(self, event):
+        # Hidden or minimized, the window system sends this when the window is minimized
+        self._visible = False
+        self._schedule()
+
+    def eventFilter(self, watched, event):
+        # Follow the exposure of the top level window, without handling the event
+        if event.type() == QEvent.Expose:
+            self._exposed = watched.isExposed()
+            self._schedule()
+        return False
+
+    def minimumSizeHint(self):
+        # Minimum size the window will allow
+        return QSize(100, 100)
+
+    def sizeHint(self):
+        # Default size of the window
+        return QSize(self.application.width, self.application.height)
+
+    def initializeGL(self):
+        # Release application resources before the context is destroyed
+        self.context().aboutToBeDestroyed.connect(self.cleanupGL)
+        # Let the application create its resources
+        self.application.initialize()
+
+    def resizeGL(self, width, height):
+        # Pass the new size on to the application in device pixels, Qt gives it in logical pixels
+        ratio = self.devicePixelRatioF()
+        self.application.on_resize(int(width * ratio), int(height * ratio))
+
+    def paintGL(self):
+        # Render a frame of the application, then keep painting only if another frame is needed
+        self.application.frame()
+        self._schedule()
+
+    def cleanupGL(self):
+        # Stop painting and make context current so resources can be deleted
+        self._released = True
+        self._schedule()
+        self.makeCurrent()
+        self.application.release()
+        self.doneCurrent()
+
+
+class MainWindow(QMainWindow):
+    def __init__(self, application):
+        # noinspection PyArgumentList
+        super().__init__()
+        # Set window title name
+        self.setWindowTitle(application.title)
+        # Create MainWidget object which is derived from QWidget
+        self.main_widget = MainWidget(application)
+        # Define MainWidget as the CentralWidget for the MainWindow
+        self.setCentralWidget(self.main_widget)
+        # Show the MainWindow
+        self.show()
+
+
+def run(application_class):
+    # Reuse a running Qt Application so several examples can share a process
+    app = QApplication.instance() or QApplication(sys.argv)
+    # Create MainWindow object which is derived from QMainWindow
+    window = MainWindow(application_class())
+    # Center the MainWindow on the screen
+    window.move((app.desktop().screenGeometry().width() - window.width()) // 2,
+                (app.desktop().screenGeometry().height() - window.height()) // 2)
+    # Return exit code when app execution is finished
+    return app.exec_()
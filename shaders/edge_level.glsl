@@ -0,0 +1,13 @@
+// Upper bound on tessellation levels, driven by the frame time controller
+uniform float max_tess_level = 5.0;
+// Size of the viewport in pixels and the target length of each segment
+uniform vec2 viewport_size = vec2(800.0, 800.0);
+uniform float pixels_per_segment = 20.0;
+
+// Tessellation level for the edge between two clip space positions
+float edge_level(vec4 a, vec4 b)
+{
+    vec2 screen_a = (a.xy / a.w) * 0.5 * viewport_size;
+    vec2 screen_b = (b.xy / b.w) * 0.5 * viewport_size;
+    return clamp(distance(screen_a, screen_b) / pixels_per_segment, 1.0, max_tess_level);
+}
@@ -0,0 +1,12 @@
+#version 440 core
+
+// Output to the framebuffer
+out vec4 color;
+
+void main(void)
+{
+    // 'color' defined from fragment position
+    color = vec4(sin(gl_FragCoord.x * 0.25) * 0.5 + 0.5,
+                 cos(gl_FragCoord.y * 0.25) * 0.5 + 0.5,
+                 sin(gl_FragCoord.x * 0.15) * cos(gl_FragCoord.y * 0.15), 1.0);
+}
@@ -0,0 +1,31 @@
+#version 440 core
+
+#include "triangle.glsl"
+
+#ifdef FRAME_BLOCK
+// 'offset' and 'color' of the frame arrive together in one std140 uniform block
+layout(std140, binding = 0) uniform FrameBlock
+{
+    vec4 offset;
+    vec4 color;
+};
+#else
+// 'offset' and 'color' are input vertex attributes
+layout(location = 0) in vec4 offset;
+layout(location = 1) in vec4 color;
+#endif
+
+// Declare VS_OUT as an output interface block
+out VS_OUT
+{
+    vec4 color; // Send color to the next stage
+} vs_out;
+
+void main(void)
+{
+    // Add 'offset' to our hard-coded vertex position
+    gl_Position = triangle_vertices[gl_VertexID] + offset;
+
+    // Output a fixed value for vs_color
+    vs_out.color = color;
+}
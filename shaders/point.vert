@@ -0,0 +1,6 @@
+#version 440 core
+
+void main(void)
+{
+    gl_Position = vec4(0.0, 0.0, 0.5, 1.0);
+}
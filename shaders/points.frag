@@ -0,0 +1,13 @@
+#version 440 core
+
+// Input from geometry shader
+layout(location = 0) in vec4 gs_color;
+
+// Output to the framebuffer
+out vec4 color;
+
+void main(void)
+{
+    // Simply assign the color we were given by the geometry shader to our output
+    color = gs_color;
+}
@@ -0,0 +1,9 @@
+#version 440 core
+
+// Output to the framebuffer
+out vec4 color;
+
+void main(void)
+{
+    color = vec4(0.0, 0.8, 1.0, 1.0);
+}
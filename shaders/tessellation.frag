@@ -0,0 +1,13 @@
+#version 440 core
+
+// Input from tessellation evaluation shader
+layout(location = 0) in vec4 ve_color;
+
+// Output to the framebuffer
+out vec4 color;
+
+void main(void)
+{
+    // Simply assign the color we were given by the tessellation evaluation shader to our output
+    color = ve_color;
+}
@@ -0,0 +1,4 @@
+// Hard-coded triangle shared by the examples, indexed with gl_VertexID
+const vec4 triangle_vertices[3] = vec4[3](vec4(0.25, -0.25, 0.5, 1.0),
+                                          vec4(-0.25, -0.25, 0.5, 1.0),
+                                          vec4(0.25, 0.25, 0.5, 1.0));
@@ -0,0 +1,56 @@
+#version 440 core
+
+// VERTEX_OFFSET moves the triangle by the 'offset' attribute and
+// VERTEX_COLOR passes the 'color' attribute on to the next stage, TESS_COORD
+// places the vertex inside the triangle by its 'tess_coord' attribute, read
+// from the location TESS_COORD is defined as
+#include "triangle.glsl"
+
+#ifdef VERTEX_OFFSET
+// 'offset' is an input vertex attribute
+layout(location = 0) in vec4 offset;
+#endif
+
+#ifdef VERTEX_COLOR
+// 'color' is an input vertex attribute
+layout(location = 1) in vec4 color;
+
+// 'vs_color' is an output that will be sent to the next stage
+out vec4 vs_color;
+#endif
+
+#ifdef TESS_COORD
+// 'tess_coord' is the tessellation coordinate of a mesh tessellated on the CPU
+layout(location = TESS_COORD) in vec3 tess_coord;
+
+// Corner of the triangle as the tessellation evaluation shader receives it
+vec4 corner(int index)
+{
+#ifdef VERTEX_OFFSET
+    return triangle_vertices[index] + offset;
+#else
+    return triangle_vertices[index];
+#endif
+}
+#endif
+
+void main(void)
+{
+#if defined(TESS_COORD)
+    // Same sum as shaders/tessellation.tese with gl_TessCoord
+    gl_Position = (tess_coord.x * corner(0) +
+                   tess_coord.y * corner(1) +
+                   tess_coord.z * corner(2));
+#elif defined(VERTEX_OFFSET)
+    // Add 'offset' to our hard-coded vertex position
+    gl_Position = triangle_vertices[gl_VertexID] + offset;
+#else
+    // Index into our array using gl_VertexID
+    gl_Position = triangle_vertices[gl_VertexID];
+#endif
+
+#ifdef VERTEX_COLOR
+    // Pass the color attribute on as vs_color
+    vs_color = color;
+#endif
+}
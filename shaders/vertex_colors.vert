@@ -0,0 +1,22 @@
+#version 440 core
+
+#include "triangle.glsl"
+
+// 'offset' is an input vertex attribute
+layout(location = 0) in vec4 offset;
+
+// 'vs_color' is an output that will be sent to the next shader stage
+out vec4 vs_color;
+
+void main(void)
+{
+    const vec4 colors[3] = vec4[3](vec4(1.0, 0.0, 0.0, 1.0),
+                                   vec4(0.0, 1.0, 0.0, 1.0),
+                                   vec4(0.0, 0.0, 1.0, 0.0));
+
+    // Add 'offset' to our hard-coded vertex position
+    gl_Position = triangle_vertices[gl_VertexID] + offset;
+
+    // Output a fixed value for vs_color
+    vs_color = colors[gl_VertexID];
+}
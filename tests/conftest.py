@@ -0,0 +1,16 @@
+"""
+PyOpenGL OpenGL SuperBible Test Configuration
+
+Puts the repository root on sys.path so the tests import sb7 however pytest
+is started, as python -m pytest from the root or as pytest tests.
+
+Author: Chase Wortman
+"""
+
+import os
+import sys
+
+# The repository root holds sb7 and the chapter examples
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
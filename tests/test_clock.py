@@ -0,0 +1,37 @@
+"""
+PyOpenGL OpenGL SuperBible Clock Tests
+
+A replay clock with no frame times, such as the placeholder sb7.batch
+starts its workers with or a recording without frames, reports time zero
+like a fixed clock that has not ticked, and ends the replay on the first
+tick.
+
+Author: Chase Wortman
+"""
+
+import pytest
+from sb7.clock import FixedClock, InputRecorder, ReplayClock, load_recording
+
+
+def test_replay_clock_without_times():
+    clock = ReplayClock([])
+    clock.start()
+    assert clock.time() == FixedClock().time() == 0.0
+    with pytest.raises(EOFError):
+        clock.tick()
+
+
+def test_replay_clock_from_an_empty_recording(tmp_path):
+    path = str(tmp_path / 'empty.rec')
+    InputRecorder(path).close()
+    clock = ReplayClock(load_recording(path)['time'])
+    assert len(clock) == 0 and clock.time() == 0.0
+
+
+def test_replay_clock_plays_back_its_times():
+    clock = ReplayClock([0.5, 1.25])
+    clock.start()
+    assert clock.time() == 0.5
+    assert [clock.tick(), clock.tick()] == [0.5, 1.25]
+    # The last time holds once the replay is over
+    assert clock.time() == 1.25
@@ -0,0 +1,86 @@
+"""
+PyOpenGL OpenGL SuperBible Frame State Tests
+
+The steady-state frame loop must not allocate. FrameState.update is checked
+to leave nothing allocated, and a whole Application.frame() loop is checked
+headless, when an EGL or OSMesa context can be created, to keep its memory
+from growing with the number of frames.
+
+Author: Chase Wortman
+"""
+
+import os
+import tracemalloc
+import pytest
+from sb7 import FrameState
+from sb7.benchmark import EXAMPLE_DIRECTORY
+from sb7.clock import FixedClock
+
+# Frames run before measuring, so lazily bound GL functions are in place and frame counters are past the
+# small integers Python keeps cached
+WARMUP_FRAMES = 300
+MEASURED_FRAMES = 500
+# Blocks a frame loop may leave behind however long it runs, the counters it replaces once and the floats the
+# interpreter keeps for reuse, while anything kept per frame leaves a block per frame
+LEFT_BEHIND = 16
+
+
+def allocated_during(function, arguments):
+    # Net bytes still allocated after calling function with each argument, made before tracing starts
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        for argument in arguments:
+            function(argument)
+        return tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def traced_blocks():
+    # Memory blocks traced so far, without the ones of the snapshots taken to count them
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+    return len(snapshot.traces)
+
+
+def blocks_left_by(function, arguments):
+    # Net number of memory blocks still allocated after calling function with each argument
+    tracemalloc.start()
+    try:
+        before = traced_blocks()
+        for argument in arguments:
+            function(argument)
+        return traced_blocks() - before
+    finally:
+        tracemalloc.stop()
+
+
+def test_frame_state_update_allocates_nothing():
+    state = FrameState()
+    arrays = (state.bg_color, state.offset, state.color)
+    times = [index / 60.0 for index in range(WARMUP_FRAMES + MEASURED_FRAMES)]
+    for current_time in times[:WARMUP_FRAMES]:
+        state.update(current_time)
+    assert allocated_during(state.update, times[WARMUP_FRAMES:]) == 0
+    # The arrays handed to OpenGL are the ones created up front
+    assert (state.bg_color, state.offset, state.color) == arrays
+
+
+def test_frame_loop_allocates_nothing():
+    from sb7.headless import HeadlessRenderer, load_application_class
+    application_class = load_application_class(os.path.join(EXAMPLE_DIRECTORY, 'Chapter3_VertexAttributes.py'))
+    application = application_class()
+    application.clock = FixedClock()
+    try:
+        renderer = HeadlessRenderer(application, 64, 64)
+    except Exception as error:
+        pytest.skip('No headless OpenGL context: {}'.format(error))
+    try:
+        for _ in range(WARMUP_FRAMES):
+            application.frame()
+        # Counted in blocks rather than bytes, as a list kept growing reallocates its buffer in steps while its
+        # items add a block each, and one-off allocations of the interpreter are a single block
+        for count in (MEASURED_FRAMES, 2 * MEASURED_FRAMES):
+            assert blocks_left_by(lambda _: application.frame(), [None] * count) <= LEFT_BEHIND
+    finally:
+        renderer.close()
@@ -0,0 +1,73 @@
+"""
+PyOpenGL OpenGL SuperBible Shader Library Tests
+
+Hot reloading must not leak GL objects. After a program or pipeline is
+rebuilt from edited files, the shader objects and stage programs it no
+longer uses are deleted and dropped from the caches, and so are the new ones
+of a reload that failed. Runs headless and is skipped when no EGL or OSMesa
+context can be created.
+
+Author: Chase Wortman
+"""
+
+import os
+import pytest
+from sb7.shaderlib import ShaderLibrary
+
+VERTEX_SOURCE = """#version 440 core
+out gl_PerVertex { vec4 gl_Position; };
+void main(void) { gl_Position = vec4(0.0, 0.0, 0.5, 1.0); }
+"""
+FRAGMENT_SOURCE = """#version 440 core
+out vec4 color;
+void main(void) { color = vec4({}, 0.0, 0.0, 1.0); }
+"""
+
+
+@pytest.fixture
+def context():
+    from sb7.headless import HeadlessContext
+    try:
+        headless_context = HeadlessContext(16, 16)
+    except Exception as error:
+        pytest.skip('No headless OpenGL context: {}'.format(error))
+    yield headless_context
+    headless_context.destroy()
+
+
+def write(directory, name, source, modified):
+    # Write a stage file with an explicit modification time, so every edit is seen as one
+    path = os.path.join(directory, name)
+    with open(path, 'w') as stage_file:
+        stage_file.write(source)
+    os.utime(path, ns=(modified, modified))
+
+
+def test_reload_deletes_what_it_replaced(context, tmp_path):
+    from sb7.gl import glDeleteProgram, glDeleteProgramPipelines, glIsProgram, glIsShader
+    directory = str(tmp_path)
+    write(directory, 'test.vert', VERTEX_SOURCE, 1000000000)
+    write(directory, 'test.frag', FRAGMENT_SOURCE.replace('{}', '1.0'), 1000000000)
+    library = ShaderLibrary(directory)
+    program = library.create_program(['test.vert', 'test.frag'])
+    pipeline = library.create_pipeline(['test.vert', 'test.frag'])
+    vertex_shader, fragment_shader = library._programs[program][2]
+    vertex_stage, fragment_stage = library._pipelines[pipeline][2]
+    try:
+        # Only the edited stage is rebuilt, the previous objects of that stage are deleted
+        write(directory, 'test.frag', FRAGMENT_SOURCE.replace('{}', '0.5'), 2000000000)
+        assert library.reload(program)
+        assert library.reload_pipeline(pipeline)
+        assert len(library._shaders) == 2 and len(library._stage_programs) == 2
+        assert glIsShader(vertex_shader) and not glIsShader(fragment_shader)
+        assert glIsProgram(vertex_stage) and not glIsProgram(fragment_stage)
+        # A stage that does not compile keeps the working objects and leaves nothing behind
+        shaders, stages = set(library._shaders.values()), set(library._stage_programs.values())
+        write(directory, 'test.frag', FRAGMENT_SOURCE.replace('{}', 'missing'), 3000000000)
+        assert not library.reload(program)
+        assert not library.reload_pipeline(pipeline)
+        assert set(library._shaders.values()) == shaders and set(library._stage_programs.values()) == stages
+    finally:
+        library.release()
+        glDeleteProgram(program)
+        glDeleteProgramPipelines(1, [pipeline])
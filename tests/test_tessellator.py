@@ -0,0 +1,80 @@
+"""
+PyOpenGL OpenGL SuperBible CPU Tessellation Tests
+
+tessellate_triangle is checked against the counts of triangles and points
+the tessellation stages of Mesa give for the same levels, for odd, even and
+fractional levels, and its coordinates against the barycentric domain. The
+mesh and capture paths of the tessellation examples are compared with the
+tessellation stages pixel for pixel headless, skipped when no EGL or OSMesa
+context can be created.
+
+Author: Chase Wortman
+"""
+
+import numpy as np
+import pytest
+from sb7.tessellator import EXAMPLE_PATHS, check_paths, round_levels, tessellate_triangle
+
+# Triangles and distinct points the tessellation stages emit at outer and inner levels, captured with transform
+# feedback from Mesa
+STAGE_COUNTS = {
+    (1, 1, 1, 1): (1, 3), (2, 2, 2, 2): (6, 7), (3, 3, 3, 3): (13, 12), (4, 4, 4, 4): (24, 19),
+    (7, 7, 7, 7): (73, 48), (64, 64, 64, 64): (6144, 3169), (1, 1, 1, 2): (3, 4), (1, 1, 1, 3): (7, 6),
+    (5, 3, 7, 4): (27, 22), (2, 9, 4, 1): (15, 16), (6, 1, 8, 5): (37, 27),
+}
+# Size in pixels of the frames compared between paths
+CHECK_SIZE = 800
+
+
+@pytest.mark.parametrize('levels', sorted(STAGE_COUNTS))
+def test_counts_match_the_tessellation_stages(levels):
+    coords, triangles = tessellate_triangle(*levels)
+    assert (len(triangles), len(coords)) == STAGE_COUNTS[levels]
+    # Every point is used and no index points past the coordinates
+    assert np.array_equal(np.unique(triangles), np.arange(len(coords)))
+    # Triangles all wind clockwise in (u, v) and cover the domain without overlapping, its area being a half
+    corners = coords[triangles][:, :, :2].astype(np.float64)
+    edges = corners[:, 1:] - corners[:, :1]
+    areas = (edges[:, 0, 1] * edges[:, 1, 0] - edges[:, 0, 0] * edges[:, 1, 1]) / 2.0
+    assert np.all(areas > 0.0)
+    assert areas.sum() == pytest.approx(0.5, abs=1e-6)
+
+
+@pytest.mark.parametrize('levels', [(1, 1, 1, 1), (3, 5, 7, 9), (2, 4, 6, 8), (64, 64, 64, 64), (6, 1, 8, 5)])
+def test_coordinates_are_barycentric(levels):
+    coords, _ = tessellate_triangle(*levels)
+    assert np.all(coords >= 0.0) and np.all(coords <= 1.0)
+    assert np.allclose(coords.sum(axis=1), 1.0, rtol=0, atol=1e-6)
+    # Points are distinct
+    assert len(np.unique(coords, axis=0)) == len(coords)
+
+
+def test_fractional_levels_round_up():
+    # equal_spacing rounds fractional levels up and clamps them to the supported range
+    assert round_levels((2.2, 3.0, 4.7), 1.5) == (3, 3, 5, 2)
+    assert round_levels((0.1, 70.0, 63.01), 0.5) == (1, 64, 64, 1)
+    coords, triangles = tessellate_triangle(*round_levels((4.3, 2.6, 6.1), 3.2))
+    assert (len(triangles), len(coords)) == STAGE_COUNTS[(5, 3, 7, 4)]
+
+
+def test_cached_meshes_are_read_only():
+    coords, triangles = tessellate_triangle(3, 5, 7, 9)
+    with pytest.raises(ValueError):
+        coords += 1.0
+    with pytest.raises(ValueError):
+        triangles[0] = 0
+
+
+@pytest.fixture(scope='module')
+def headless():
+    from sb7.headless import HeadlessContext
+    try:
+        HeadlessContext(16, 16).destroy()
+    except Exception as error:
+        pytest.skip('No headless OpenGL context: {}'.format(error))
+
+
+@pytest.mark.parametrize('patch_count', [1, 100])
+@pytest.mark.parametrize('filename, paths', EXAMPLE_PATHS)
+def test_paths_draw_the_same_pixels(headless, filename, paths, patch_count):
+    assert check_paths(filename, paths, CHECK_SIZE, patch_count) == {path: 0 for path in paths}